@@ -1,6 +1,7 @@
 import pytest
 from pathlib import Path
 from console_test_runner.utils.helper import ConsoleTestUtils
+from console_test_runner.utils.runspec_loader import RunspecLoader
 
 
 def pytest_addoption(parser):
@@ -24,8 +25,7 @@ def runspec_file(request):
 
 def load_test_cases(runspec_file):
     """Load test cases from the specified runspec file."""
-    runspec_data = ConsoleTestUtils.read_runspec_file(runspec_file)
-    return [(test["name"], test) for test in runspec_data["tests"]]
+    return [(test["name"], test) for test in RunspecLoader(runspec_file).iter_tests()]
 
 
 def pytest_generate_tests(metafunc):
@@ -0,0 +1,374 @@
+import json
+import logging
+import os
+import socket
+import socketserver
+import stat
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, Iterable, Optional, Tuple, Union
+
+from console_test_runner.utils.sm_helper import SMHelper
+from console_test_runner.utils.timing import timer
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+Address = Union[Tuple[str, int], str]
+
+# Workers send a heartbeat this often; the coordinator drops a worker silent for WORKER_TIMEOUT.
+HEARTBEAT_INTERVAL = 5.0
+WORKER_TIMEOUT = 30.0
+
+
+def parse_address(address: str) -> Tuple[int, Address]:
+    """Parses 'host:port' or 'unix:/path/to.sock' into a socket family and address."""
+    if address.startswith("unix:"):
+        if not hasattr(socket, "AF_UNIX"):
+            raise ValueError("Unix sockets are not supported on this platform")
+        return socket.AF_UNIX, address[len("unix:"):]
+    host, sep, port = address.rpartition(":")
+    if not sep or not port.isdigit():
+        raise ValueError(f"Invalid address '{address}', expected host:port or unix:/path")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+
+def _send(stream, message: dict) -> None:
+    """Writes one newline-delimited JSON message to a binary stream."""
+    stream.write(json.dumps(message).encode("utf-8") + b"\n")
+    stream.flush()
+
+
+def _enable_keepalive(sock: socket.socket) -> None:
+    if sock.family != getattr(socket, "AF_UNIX", None):
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+
+def _receive(stream) -> Optional[dict]:
+    """Reads one message from a binary stream, or None once the peer has gone."""
+    line = stream.readline()
+    if not line:
+        return None
+    message: dict = json.loads(line.decode("utf-8"))
+    return message
+
+
+class _CoordinatorServer(socketserver.BaseServer):
+    """Server base carrying the coordinator that its handlers serve tests from."""
+
+    coordinator: "TestCoordinator"
+
+
+class _CoordinatorHandler(socketserver.StreamRequestHandler):
+    """Serves tests to a single worker connection."""
+
+    server: _CoordinatorServer
+
+    def handle(self):
+        coordinator = self.server.coordinator
+        current = None
+        worker = f"{self.client_address}"
+        # A worker host that vanishes without closing its socket stops sending
+        # heartbeats, so reads time out and its test is re-queued.
+        _enable_keepalive(self.connection)
+        self.connection.settimeout(coordinator.worker_timeout)
+        try:
+            while True:
+                message = _receive(self.rfile)
+                if message is None:
+                    break
+                kind = message.get("type")
+                if kind == "hello":
+                    worker = message.get("worker", worker)
+                    logging.info(f"Worker connected: {worker}")
+                elif kind == "request":
+                    current = coordinator._next_test(worker)
+                    if current is None:
+                        _send(self.wfile, {"type": "done"})
+                        break
+                    test_id, test_case = current
+                    _send(self.wfile, {"type": "test", "id": test_id, "test_case": test_case})
+                elif kind == "result":
+                    coordinator._record_result(message)
+                    current = None
+        except socket.timeout:
+            logging.error(f"Worker {worker} sent nothing for {coordinator.worker_timeout}s")
+        except (OSError, ValueError) as e:
+            logging.error(f"Lost connection to worker {worker}: {e}")
+        finally:
+            if current is not None:
+                coordinator._requeue(current, worker)
+
+
+class _TCPServer(_CoordinatorServer, socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def _is_stale_socket(path: str) -> bool:
+    """Checks whether path is a socket file that no server is listening on."""
+    try:
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            return False
+    except FileNotFoundError:
+        return False
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except ConnectionRefusedError:
+            return True
+    return False
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+
+    class _UnixServer(_CoordinatorServer, socketserver.ThreadingUnixStreamServer):
+        """Unix socket server that removes its socket file when it is closed."""
+
+        daemon_threads = True
+        bound = False
+
+        def server_bind(self) -> None:
+            # A coordinator that was killed leaves its socket file behind.
+            path = str(self.server_address)
+            if _is_stale_socket(path):
+                os.unlink(path)
+            super().server_bind()
+            self.bound = True
+
+        def server_close(self) -> None:
+            super().server_close()
+            # Only our own socket is removed, not one that failed to bind over a live one.
+            if self.bound:
+                self.bound = False
+                try:
+                    os.unlink(str(self.server_address))
+                except FileNotFoundError:
+                    pass
+
+
+class TestCoordinator:
+    """Serves a queue of runspec test cases to workers over a TCP or Unix socket.
+
+    Test cases are pulled lazily from the given iterable. A test handed to a
+    worker whose connection drops before it reports a result is re-queued and
+    served to the next worker that asks for one. The same happens when a
+    worker sends no message (not even a heartbeat) for ``worker_timeout`` seconds.
+    """
+
+    __test__ = False  # not a pytest test class
+
+    def __init__(
+        self, address: str, test_cases: Iterable[dict], worker_timeout: float = WORKER_TIMEOUT
+    ):
+        self.address = address
+        self.worker_timeout = worker_timeout
+        self.results: Dict[int, dict] = {}
+        self._source = enumerate(test_cases)
+        self._source_exhausted = False
+        self._pending: Deque[Tuple[int, dict]] = deque()
+        self._in_flight: Dict[int, Tuple[str, dict]] = {}
+        self._condition = threading.Condition()
+        self._server: Optional[_CoordinatorServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> Address:
+        """Starts serving in a background thread and returns the bound address."""
+        _, address = parse_address(self.address)
+        server: _CoordinatorServer
+        if isinstance(address, tuple):
+            server = _TCPServer(address, _CoordinatorHandler)
+        else:
+            server = _UnixServer(address, _CoordinatorHandler)
+        server.coordinator = self
+        self._server = server
+        self._thread = threading.Thread(target=server.serve_forever, daemon=True)
+        self._thread.start()
+        bound: Address = server.socket.getsockname()
+        logging.info(f"Coordinator listening on {bound}")
+        return bound
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until every test has a result. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while not self._finished():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def shutdown(self) -> None:
+        """Stops the server and releases the socket."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def serve(self, timeout: Optional[float] = None) -> Dict[int, dict]:
+        """Serves all tests until completion and returns the results by test id."""
+        self.start()
+        try:
+            if not self.wait(timeout):
+                raise TimeoutError("Timed out waiting for workers to finish")
+        finally:
+            self.shutdown()
+        return self.results
+
+    def _finished(self) -> bool:
+        return self._source_exhausted and not self._pending and not self._in_flight
+
+    def _next_test(self, worker: str) -> Optional[Tuple[int, dict]]:
+        with self._condition:
+            while True:
+                if self._pending:
+                    current = self._pending.popleft()
+                    break
+                if not self._source_exhausted:
+                    try:
+                        current = next(self._source)
+                        break
+                    except StopIteration:
+                        self._source_exhausted = True
+                if self._finished():
+                    self._condition.notify_all()
+                    return None
+                # Tests are still in flight elsewhere and may come back if a worker dies.
+                self._condition.wait()
+            self._in_flight[current[0]] = (worker, current[1])
+            return current
+
+    def _record_result(self, message: dict) -> None:
+        with self._condition:
+            test_id = message["id"]
+            if test_id in self.results:
+                return
+            self._in_flight.pop(test_id, None)
+            self.results[test_id] = message
+            logging.info(
+                f"[{message.get('worker')}] {message.get('name')}: {message.get('status')}"
+                f" ({message.get('duration', 0.0):.2f}s)"
+            )
+            self._condition.notify_all()
+
+    def _requeue(self, current: Tuple[int, dict], worker: str) -> None:
+        with self._condition:
+            test_id, test_case = current
+            if test_id in self.results or test_id not in self._in_flight:
+                return
+            del self._in_flight[test_id]
+            self._pending.appendleft(current)
+            logging.warning(f"Worker {worker} lost, re-queuing test: {test_case.get('name')}")
+            self._condition.notify_all()
+
+
+class TestWorker:
+    """Pulls test cases from a coordinator and runs them with a local runner.
+
+    The runner (normally a ConsoleTestRunner) is created once per worker, so
+    executable resolution and input checks are reused between tests. Test cases
+    arrive unresolved and their keywords are resolved against this host. A
+    background thread sends heartbeats so the coordinator can tell a busy worker
+    from a lost one. While the phase timer is enabled (``--trace``), each result
+    also carries the seconds spent per phase of the test.
+    """
+
+    __test__ = False  # not a pytest test class
+
+    def __init__(
+        self,
+        address: str,
+        runner,
+        name: Optional[str] = None,
+        heartbeat_interval: float = HEARTBEAT_INTERVAL,
+    ):
+        self.address = address
+        self.runner = runner
+        self.heartbeat_interval = heartbeat_interval
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}"
+
+    def connect(self) -> socket.socket:
+        _, address = parse_address(self.address)
+        if isinstance(address, tuple):
+            sock = socket.create_connection(address)
+            _enable_keepalive(sock)
+            return sock
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(address)
+        return sock
+
+    def run(self) -> int:
+        """Runs tests until the coordinator reports the queue is empty.
+
+        Returns:
+            int: The number of tests this worker executed.
+        """
+        executed = 0
+        send_lock = threading.Lock()
+        stopped = threading.Event()
+
+        def send(message: dict) -> None:
+            with send_lock:
+                _send(stream, message)
+
+        def heartbeat() -> None:
+            while not stopped.wait(self.heartbeat_interval):
+                try:
+                    send({"type": "heartbeat"})
+                except OSError:
+                    return
+
+        with self.connect() as sock, sock.makefile("rwb") as stream:
+            send({"type": "hello", "worker": self.name})
+            heartbeat_thread = threading.Thread(target=heartbeat, daemon=True)
+            heartbeat_thread.start()
+            try:
+                while True:
+                    send({"type": "request"})
+                    message = _receive(stream)
+                    if message is None or message.get("type") == "done":
+                        break
+                    send(self.run_one(message["id"], message["test_case"]))
+                    executed += 1
+            finally:
+                stopped.set()
+                heartbeat_thread.join()
+        logging.info(f"Worker {self.name} finished after {executed} tests")
+        return executed
+
+    def run_one(self, test_id: int, test_case: dict) -> dict:
+        """Runs a single test case and builds the result message."""
+        start = time.monotonic()
+        first_span = len(timer.spans)
+        status, error = "passed", ""
+        try:
+            with timer.span("test", test=test_case.get("name"), worker=self.name):
+                self.runner.run_test(SMHelper.resolve_keywords(test_case))
+        except Exception as e:
+            status, error = "failed", f"{type(e).__name__}: {e}"
+            logging.error(f"Test failed: {test_case.get('name')} - {error}")
+        result = {
+            "type": "result",
+            "id": test_id,
+            "name": test_case.get("name"),
+            "status": status,
+            "error": error,
+            "duration": time.monotonic() - start,
+            "worker": self.name,
+        }
+        if timer.enabled:
+            result["phases"] = self.phase_durations(first_span)
+        return result
+
+    @staticmethod
+    def phase_durations(first_span: int) -> Dict[str, float]:
+        """Sums the seconds per phase of the spans this thread recorded since first_span."""
+        thread = threading.get_ident()
+        phases: Dict[str, float] = defaultdict(float)
+        for name, _, duration, span_thread, _ in timer.spans[first_span:]:
+            if span_thread == thread:
+                phases[name] += duration / 1e9
+        return dict(phases)
@@ -0,0 +1,255 @@
+import hashlib
+import json
+import logging
+import os
+import platform
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from console_test_runner.utils.runspec_loader import RunspecLoader
+from console_test_runner.utils.sm_helper import SMHelper
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# Bump whenever the layout of TestPlan or ExecutionPlan changes to invalidate old caches.
+PLAN_FORMAT_VERSION = 2
+
+# The failure outcomes ``expect_error`` can name.
+OUTCOMES = ("error", "timeout", "cpu_limit", "memory_limit")
+
+
+class TestPlan:
+    """The fully resolved, immutable invocation of a single runspec test case.
+
+    Attributes:
+        name (str): The test name.
+        argv (tuple): The exact tool command line, empty if the tool is not run.
+        input_files (tuple): Resolved input paths, checked for existence at run time.
+        output_files (tuple): Resolved output paths.
+        compare_string (str): Expected ``--help`` text, or None.
+        expect_error (bool, str or list): True if any conversion error is expected,
+            or the limit name(s) the test is expected to hit, see ``expects``.
+        dettach_license (bool): Whether the license key is hidden during the test.
+        check_output_exist (bool): Whether every output file must exist afterwards.
+        create_output_dir (bool): Whether output directories are created beforehand.
+        cleanup (bool): Whether output files are deleted afterwards.
+        timeout (float): Wall-clock limit for the tool in seconds, or None.
+        cpu_limit (float): CPU-seconds limit for the tool, or None.
+        memory_limit (float): Resident memory limit for the tool in MB, or None.
+        resources (tuple): Shared resources the test touches (output files and
+            the license key) so callers can avoid running conflicting tests together.
+        error (str): A runspec error detected while compiling, raised when the test runs.
+    """
+
+    __test__ = False  # not a pytest test class
+    __slots__ = (
+        "name",
+        "argv",
+        "input_files",
+        "output_files",
+        "compare_string",
+        "expect_error",
+        "dettach_license",
+        "check_output_exist",
+        "create_output_dir",
+        "cleanup",
+        "timeout",
+        "cpu_limit",
+        "memory_limit",
+        "resources",
+        "error",
+    )
+    name: str
+    argv: Tuple[str, ...]
+    input_files: Tuple[Path, ...]
+    output_files: Tuple[Path, ...]
+    compare_string: Optional[str]
+    expect_error: Union[bool, str, List[str], Tuple[str, ...]]
+    dettach_license: bool
+    check_output_exist: bool
+    create_output_dir: bool
+    cleanup: bool
+    timeout: Optional[float]
+    cpu_limit: Optional[float]
+    memory_limit: Optional[float]
+    resources: Tuple[str, ...]
+    error: Optional[str]
+
+    def __init__(self, **fields):
+        for slot in self.__slots__:
+            object.__setattr__(self, slot, fields.get(slot))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def to_dict(self) -> dict:
+        data = {}
+        for slot in self.__slots__:
+            value = getattr(self, slot)
+            data[slot] = [str(item) for item in value] if isinstance(value, tuple) else value
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TestPlan":
+        fields = dict(data)
+        for slot in ("argv", "resources"):
+            fields[slot] = tuple(fields[slot])
+        for slot in ("input_files", "output_files"):
+            fields[slot] = tuple(Path(p) for p in fields[slot])
+        return cls(**fields)
+
+    def expects(self, outcome: str) -> bool:
+        """Checks whether a failure outcome satisfies ``expect_error``.
+
+        The outcome is "error" for ordinary conversion failures, or the name of the
+        violated limit ("timeout", "cpu_limit", "memory_limit"). ``expect_error: true``
+        only matches "error", so a hung tool never passes as an expected failure.
+        """
+        if isinstance(self.expect_error, str):
+            return self.expect_error == outcome
+        if isinstance(self.expect_error, (list, tuple)):
+            return outcome in self.expect_error
+        return bool(self.expect_error) and outcome == "error"
+
+    def describe(self) -> str:
+        """Returns a human readable summary, as shown by ``--plan``."""
+        flags = [
+            flag
+            for flag in ("expect_error", "dettach_license", "check_output_exist", "cleanup")
+            if getattr(self, flag)
+        ]
+        lines = [f"{self.name} [{', '.join(flags)}]"]
+        if self.argv:
+            lines.append(f"    run: {' '.join(self.argv)}")
+        limits = [
+            f"{limit}={getattr(self, limit)}"
+            for limit in ("timeout", "cpu_limit", "memory_limit")
+            if getattr(self, limit) is not None
+        ]
+        if limits:
+            lines.append(f"    limits: {', '.join(limits)}")
+        if self.compare_string is not None:
+            lines.append("    compare: --help output")
+        if self.error:
+            lines.append(f"    error: {self.error}")
+        return "\n".join(lines)
+
+
+class ExecutionPlan:
+    """A compiled runspec: the resolved environment plus one TestPlan per test case."""
+
+    __slots__ = ("key", "general", "environment", "tests")
+    key: str
+    general: dict
+    environment: Dict[str, Path]
+    tests: Tuple[TestPlan, ...]
+
+    def __init__(
+        self, key: str, general: dict, environment: Dict[str, Path], tests: Tuple[TestPlan, ...]
+    ):
+        self.key = key
+        self.general = general
+        self.environment = environment
+        self.tests = tests
+
+    def to_dict(self) -> dict:
+        return {
+            "version": PLAN_FORMAT_VERSION,
+            "key": self.key,
+            "general": self.general,
+            "environment": {name: str(path) for name, path in self.environment.items()},
+            "tests": [test.to_dict() for test in self.tests],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ExecutionPlan":
+        return cls(
+            data["key"],
+            data["general"],
+            {name: Path(path) for name, path in data["environment"].items()},
+            tuple(TestPlan.from_dict(test) for test in data["tests"]),
+        )
+
+    def is_valid(self) -> bool:
+        """Checks that the cached environment still exists on disk."""
+        return self.environment["executable"].is_file() and self.environment["input_dir"].is_dir()
+
+    def describe(self) -> str:
+        """Returns the human readable plan shown by ``--plan``."""
+        lines = [f"Executable: {self.environment['executable']}"]
+        lines.extend(test.describe() for test in self.tests)
+        lines.append(f"{len(self.tests)} tests")
+        return "\n".join(lines)
+
+    @staticmethod
+    def compute_key(runspec_file: Path) -> str:
+        """Hashes the runspec content with the environment its paths resolve against.
+
+        Relative folders in ``general`` resolve against the working directory, so it
+        is part of the key along with EOD_BASE and the xplat root. The files matched
+        by matrix declarations are hashed too, so adding or removing an input file
+        recompiles the plan. Listing them walks the input folder, but nothing is
+        resolved or compiled.
+        """
+        try:
+            xplat_root = str(SMHelper.find_xplat_root())
+        except RuntimeError:
+            xplat_root = ""
+        digest = hashlib.sha256()
+        digest.update(Path(runspec_file).read_bytes())
+        for part in (
+            str(PLAN_FORMAT_VERSION),
+            platform.system(),
+            os.environ.get("EOD_BASE", ""),
+            xplat_root,
+            str(Path(runspec_file).resolve().parent),
+            os.getcwd(),
+        ):
+            digest.update(b"\0" + part.encode("utf-8"))
+        digest.update(b"\0matrix")
+        for relative_input in RunspecLoader(runspec_file).iter_matrix_inputs():
+            digest.update(b"\0" + relative_input.encode("utf-8"))
+        return digest.hexdigest()
+
+
+class PlanCache:
+    """Stores compiled execution plans as JSON files named by their key."""
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+
+    def path_for(self, key: str) -> Path:
+        return self.cache_dir / f"plan-{key[:32]}.json"
+
+    def load(self, key: str) -> Optional[ExecutionPlan]:
+        """Returns the cached plan for the key, or None if it is missing or stale."""
+        path = self.path_for(key)
+        if not path.exists():
+            return None
+        try:
+            with path.open("r") as f:
+                data = json.load(f)
+            if data.get("version") != PLAN_FORMAT_VERSION or data.get("key") != key:
+                return None
+            plan = ExecutionPlan.from_dict(data)
+        except (json.JSONDecodeError, KeyError, TypeError) as e:
+            logging.warning(f"Ignoring unreadable plan cache {path}: {e}")
+            return None
+        if not plan.is_valid():
+            logging.info(f"Cached plan {path} refers to missing files, recompiling")
+            return None
+        logging.info(f"Loaded execution plan from {path}")
+        return plan
+
+    def save(self, plan: ExecutionPlan) -> Path:
+        """Writes the plan atomically and returns its path."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(plan.key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with tmp_path.open("w") as f:
+            json.dump(plan.to_dict(), f)
+        os.replace(tmp_path, path)
+        logging.info(f"Saved execution plan to {path}")
+        return path
@@ -1,9 +1,12 @@
 import logging
-import json
 import pytest
 from pathlib import Path
+from typing import Optional, Set
 from console_test_runner.utils.sm_helper import SMHelper
-from console_test_runner.utils.helper import ConsoleTestUtils
+from console_test_runner.utils.helper import ConsoleTestUtils, ResourceLimitError
+from console_test_runner.utils.runspec_loader import RunspecLoader
+from console_test_runner.utils.timing import timer
+from console_test_runner.plan import OUTCOMES, ExecutionPlan, PlanCache, TestPlan
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -13,31 +16,56 @@ logging.basicConfig(
 class ConsoleTestRunner:
     """Console Test Runner class for executing tests based on configuration."""
 
-    def __init__(self, runspec_file: str):
+    def __init__(self, runspec_file: str, plan_cache_dir: Optional[str] = None):
         self.runspec_file = Path(runspec_file)
         assert self.runspec_file.exists(), f"Runspec file {self.runspec_file} not found"
-        self.test_config = self.load_config()
-        self.environment = self.setup_environment()
+        self.loader = RunspecLoader(self.runspec_file)
+        # Inputs already verified by an earlier test; reused when the runner serves many tests.
+        self.checked_inputs: Set[Path] = set()
+        self.plan = None
+
+        if plan_cache_dir is not None:
+            cache = PlanCache(Path(plan_cache_dir))
+            with timer.span("load_plan"):
+                key = ExecutionPlan.compute_key(self.runspec_file)
+                self.plan = cache.load(key)
+            if self.plan is not None:
+                # A cached plan skips keyword resolution and executable discovery entirely.
+                self.test_config = {"general": self.plan.general}
+                self.environment = self.plan.environment
+                ConsoleTestUtils.ensure_directory_exists(self.environment["output_dir"])
+                return
+
+        with timer.span("load_config"):
+            self.test_config = self.load_config()
+        with timer.span("setup_environment"):
+            self.environment = self.setup_environment()
+        if plan_cache_dir is not None:
+            self.plan = self.compile_plan(key)
+            with timer.span("save_plan"):
+                cache.save(self.plan)
 
     def load_config(self):
-        """Loads the test configuration from the runspec JSON file."""
+        """Loads the general section of the runspec; test cases are streamed by iter_tests."""
         logging.info(f"Loading configuration from {self.runspec_file}")
-        with self.runspec_file.open("r") as f:
-            return json.load(f)
+        return {"general": self.loader.general()}
 
     def setup_environment(self):
         """Sets up the test environment, resolving paths dynamically."""
-        self.test_config = SMHelper.resolve_keywords(self.test_config)  # Resolve all placeholders
+        with timer.span("resolve_keywords"):
+            self.test_config = SMHelper.resolve_keywords(self.test_config)  # Resolve all placeholders
 
         config = self.test_config["general"]
         tool_path = Path(config["tool_path"]).resolve()
         input_dir = Path(config["input_folder"]).resolve()
         output_dir = Path(config["output_folder"]).resolve()
         
-        ConsoleTestUtils.ensure_directory_exists(output_dir)
+        with timer.span("prepare_output_dir"):
+            ConsoleTestUtils.ensure_directory_exists(output_dir)
 
         executable_name = config["tool_name"]
-        tool_path = ConsoleTestUtils.get_executable(tool_path, tool_path, executable_name)
+        with timer.span("discover_executable"):
+            tool_path = ConsoleTestUtils.get_executable(tool_path, tool_path, executable_name)
         logging.info(f"Executable found at {tool_path}")
 
         environment = {
@@ -51,123 +79,196 @@ class ConsoleTestRunner:
 
         return environment
 
-    def run_test(self, test_case):
-        """Executes and validates a single test case."""
-        logging.info(f"Running test: {test_case['name']}")
+    def compile_test(self, test_case) -> TestPlan:
+        """Resolves a test case into the exact invocation that run_test performs."""
+        inputs = test_case.get("inputs", [])
+        outputs = test_case.get("output", [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        if isinstance(outputs, str):
+            outputs = [outputs]
+
+        input_files = tuple(
+            (
+                Path(inp).resolve()
+                if Path(inp).is_absolute()
+                else self.environment["input_dir"] / inp
+            )
+            for inp in inputs
+            if inp
+        )
+        output_files = tuple(
+            (
+                Path(out).resolve()
+                if Path(out).is_absolute()
+                else self.environment["output_dir"] / out
+            )
+            for out in outputs
+            if out
+        )
+
+        # Use the parent directory of the first input file if available, otherwise use the input directory
+        input_dir = (
+            str(input_files[0].parent)
+            if input_files
+            else str(self.environment["input_dir"])
+        )
+
+        tool_args = [
+            arg.replace("{INPUT}", input_dir) if "{INPUT}" in arg else arg
+            for arg in test_case.get("arguments", [])
+        ]
+        tool_args = SMHelper.resolve_keywords(tool_args)
+
+        error = None
+        if (
+            (not inputs or all(not inp for inp in inputs))
+            and (not outputs or all(not out for out in outputs))
+            and (not tool_args or all(not arg for arg in tool_args))
+        ):
+            error = "Inputs, outputs, and arguments are all empty. At least one must be provided."
+
         expect_error = test_case.get("expect_error", False)
+        expected = [expect_error] if isinstance(expect_error, str) else expect_error
+        if isinstance(expected, list):
+            unknown = [outcome for outcome in expected if outcome not in OUTCOMES]
+            if unknown:
+                error = f"Unknown expect_error outcome(s) {unknown}, expected some of {list(OUTCOMES)}"
+            elif "memory_limit" in expected and not ConsoleTestUtils.can_limit_memory():
+                error = "memory_limit violations cannot be detected on this platform"
+
+        argv = ()
+        if input_files and output_files:
+            argv = (
+                str(self.environment["executable"]),
+                "--input",
+                " ".join(str(inp) for inp in input_files),
+                "--output",
+                " ".join(str(out) for out in output_files),
+                *tool_args,
+            )
+
+        general = self.test_config["general"]
         dettach_license = test_case.get("dettach_license", False)
-        cleanup = self.test_config["general"].get("cleanup", False)
+        resources = tuple(str(out) for out in output_files)
+        if dettach_license:
+            resources += ("license_key",)
+
+        return TestPlan(
+            name=test_case["name"],
+            argv=argv,
+            input_files=input_files,
+            output_files=output_files,
+            compare_string=test_case.get("compare_string"),
+            expect_error=expect_error,
+            dettach_license=dettach_license,
+            check_output_exist=test_case.get("check_output_exist", True),
+            create_output_dir=test_case.get("create_output_dir", True),
+            cleanup=general.get("cleanup", False),
+            timeout=test_case.get("timeout", general.get("timeout")),
+            cpu_limit=test_case.get("cpu_limit", general.get("cpu_limit")),
+            memory_limit=test_case.get("memory_limit", general.get("memory_limit")),
+            resources=resources,
+            error=error,
+        )
+
+    def compile_plan(self, key: Optional[str] = None) -> ExecutionPlan:
+        """Compiles every test case of the runspec into an execution plan."""
+        logging.info(f"Compiling execution plan for {self.runspec_file}")
+        with timer.span("compile_plan"):
+            return ExecutionPlan(
+                key or ExecutionPlan.compute_key(self.runspec_file),
+                self.test_config["general"],
+                self.environment,
+                tuple(self.compile_test(test_case) for test_case in self.iter_tests()),
+            )
+
+    def run_test(self, test_case):
+        """Executes and validates a single test case."""
+        with timer.span("compile", test=test_case["name"]):
+            plan = self.compile_test(test_case)
+        self.execute_test(plan)
+
+    def execute_test(self, plan: TestPlan):
+        """Executes and validates a single compiled test case."""
+        logging.info(f"Running test: {plan.name}")
         license_backup = None
-        output_files = []
 
         try:
-            if dettach_license and "license_key" in self.environment:
+            if plan.dettach_license and "license_key" in self.environment:
                 license_backup = self.environment["license_key"].with_suffix(".bak")
                 self.environment["license_key"].rename(license_backup)
                 logging.info(f"License key renamed to {license_backup}")
 
-            inputs = test_case.get("inputs", [])
-            outputs = test_case.get("output", [])
-            if isinstance(inputs, str):
-                inputs = [inputs]
-            if isinstance(outputs, str):
-                outputs = [outputs]
-
-            input_files = [
-                (
-                    Path(inp).resolve()
-                    if Path(inp).is_absolute()
-                    else self.environment["input_dir"] / inp
-                )
-                for inp in inputs
-                if inp
-            ]
-
-            for inp in input_files:
-                ConsoleTestUtils.check_file_exists(inp)
-
-            output_files = [
-                (
-                    Path(out).resolve()
-                    if Path(out).is_absolute()
-                    else self.environment["output_dir"] / out
-                )
-                for out in outputs
-                if out
-            ]
+            with timer.span("check_inputs", test=plan.name):
+                for inp in plan.input_files:
+                    if inp not in self.checked_inputs:
+                        ConsoleTestUtils.check_file_exists(inp)
+                        self.checked_inputs.add(inp)
 
             # Check the flag to determine whether to create the output directory
-            create_output_dir = test_case.get("create_output_dir", True)
-            if create_output_dir:
-                for output_file in output_files:
-                    output_file.parent.mkdir(parents=True, exist_ok=True)
-
-            # Use the parent directory of the first input file if available, otherwise use the input directory
-            input_dir = (
-                str(input_files[0].parent)
-                if input_files
-                else str(self.environment["input_dir"])
-            )
-
+            if plan.create_output_dir:
+                with timer.span("prepare_outputs", test=plan.name):
+                    for output_file in plan.output_files:
+                        output_file.parent.mkdir(parents=True, exist_ok=True)
 
-            tool_args = [
-                arg.replace("{INPUT}", input_dir) if "{INPUT}" in arg else arg
-                for arg in test_case.get("arguments", [])
-            ]
-            tool_args=SMHelper.resolve_keywords(tool_args)
-
-            if (
-                (not inputs or all(not inp for inp in inputs))
-                and (not outputs or all(not out for out in outputs))
-                and (not tool_args or all(not arg for arg in tool_args))
-            ):
-                raise ValueError(
-                    "Inputs, outputs, and arguments are all empty. At least one must be provided."
-                )
+            if plan.error:
+                raise ValueError(plan.error)
 
-            input_args = " ".join(str(inp) for inp in input_files)
-            output_args = " ".join(str(out) for out in output_files)
-
-            if input_files and output_files:
+            if plan.argv:
                 ConsoleTestUtils.run_conversion(
-                    str(self.environment["executable"]),
-                    "--input",
-                    input_args,
-                    "--output",
-                    output_args,
-                    *tool_args,
+                    *plan.argv,
+                    timeout=plan.timeout,
+                    cpu_limit=plan.cpu_limit,
+                    memory_limit=plan.memory_limit,
                 )
 
-            check_output_exist = test_case.get("check_output_exist", True)
-            if check_output_exist:
-                for output_file in output_files:
-                    assert (
-                        output_file.exists()
-                    ), f"Output file {output_file} does not exist"
-            if "compare_string" in test_case:
+            if plan.check_output_exist:
+                with timer.span("verify_outputs", test=plan.name):
+                    for output_file in plan.output_files:
+                        assert (
+                            output_file.exists()
+                        ), f"Output file {output_file} does not exist"
+            if plan.compare_string is not None:
                 ConsoleTestUtils.compare_argument(
-                    str(self.environment["executable"]), test_case["compare_string"]
+                    str(self.environment["executable"]), plan.compare_string, plan.timeout
                 )
-            if expect_error:
+            if plan.expect_error:
                 raise AssertionError("Expected an error but the test passed.")
-            logging.info(f"Test passed: {test_case['name']}")
+            logging.info(f"Test passed: {plan.name}")
+        except ResourceLimitError as e:
+            if not plan.expects(e.limit):
+                raise e
+            logging.info(f"Test hit its {e.limit} as expected: {plan.name} - {e}")
         except (RuntimeError, FileNotFoundError, ValueError) as e:
-            if not expect_error:
+            if not plan.expects("error"):
                 raise e
-            logging.info(f"Test failed as expected: {test_case['name']} - {e}")
+            logging.info(f"Test failed as expected: {plan.name} - {e}")
         finally:
-            if dettach_license and license_backup:
+            if plan.dettach_license and license_backup:
                 license_backup.rename(self.environment["license_key"])
                 logging.info(f"License key restored from {license_backup}")
-            if cleanup:
-                for output_file in output_files:
-                    if output_file.exists():
-                        output_file.unlink()
-                        logging.info(f"Deleted output file: {output_file}")
+            if plan.cleanup:
+                with timer.span("cleanup", test=plan.name):
+                    for output_file in plan.output_files:
+                        if output_file.exists():
+                            output_file.unlink()
+                            logging.info(f"Deleted output file: {output_file}")
+
+    def iter_tests(self):
+        """Yields the runspec test cases one at a time with their keywords resolved."""
+        for test_case in self.loader.iter_tests(self.environment["input_dir"]):
+            yield SMHelper.resolve_keywords(test_case)
 
     def run_all_tests(self):
         """Runs all test cases defined in the runspec file."""
         logging.info("Starting all tests")
-        for test_case in self.test_config["tests"]:
-            self.run_test(test_case)
+        if self.plan is not None:
+            for plan in self.plan.tests:
+                with timer.span("test", test=plan.name):
+                    self.execute_test(plan)
+        else:
+            for test_case in self.iter_tests():
+                with timer.span("test", test=test_case["name"]):
+                    self.run_test(test_case)
         logging.info("All tests completed successfully")
@@ -11,6 +11,14 @@ from os import environ, getcwd
 from typing import List, Optional, Union
 import json
 import os
+import signal
+import time
+from console_test_runner.utils.timing import timer
+
+try:
+    import resource
+except ImportError:  # Windows has no rlimits; only the wall-clock timeout applies there.
+    resource = None  # type: ignore[assignment]
 
 # Configure logging
 logging.basicConfig(
@@ -24,6 +32,24 @@ class AuthorizationError(Exception):
     pass
 
 
+class ResourceLimitError(RuntimeError):
+    """Exception raised when a conversion exceeds one of its resource limits.
+
+    Attributes:
+        limit (str): The violated limit: "timeout", "cpu_limit" or "memory_limit".
+    """
+
+    def __init__(self, limit: str, message: str):
+        super().__init__(message)
+        self.limit = limit
+
+
+# How often the resident memory of a tool under a memory limit is sampled.
+MEMORY_POLL_INTERVAL = 0.05
+# How long to wait for output pipes after a killed tool, in case a grandchild escaped the kill.
+KILL_GRACE_PERIOD = 5.0
+
+
 class ConsoleTestUtils:
     """Utility class for Console Test Runner"""
 
@@ -31,24 +57,26 @@ class ConsoleTestUtils:
     def extract_package(package_path: Path, extract_to: Path) -> None:
         """Extracts the package if it is a zip or tar file."""
         logging.info(f"Extracting package {package_path} to {extract_to}")
-        if package_path.suffix == ".zip":
-            with zipfile.ZipFile(package_path, "r") as zip_ref:
-                zip_ref.extractall(extract_to)
-        elif package_path.suffix in [".tar", ".gz"]:
-            with tarfile.open(package_path, "r:*") as tar_ref:
-                tar_ref.extractall(extract_to)
-        else:
-            logging.error("Unsupported package format")
-            raise ValueError("Unsupported package format")
+        with timer.span("extract_package", package=str(package_path)):
+            if package_path.suffix == ".zip":
+                with zipfile.ZipFile(package_path, "r") as zip_ref:
+                    zip_ref.extractall(extract_to)
+            elif package_path.suffix in [".tar", ".gz"]:
+                with tarfile.open(package_path, "r:*") as tar_ref:
+                    tar_ref.extractall(extract_to)
+            else:
+                logging.error("Unsupported package format")
+                raise ValueError("Unsupported package format")
 
     @staticmethod
     def find_executable(main_folder: Path, executable_name: str) -> Path:
         """Finds the executable within the specified folder."""
         logging.info(f"Searching for executable {executable_name} in {main_folder}")
-        for p in main_folder.rglob("*"):
-            if p.name == executable_name and p.is_file():
-                logging.info(f"Found executable: {p}")
-                return p
+        with timer.span("find_executable", folder=str(main_folder)):
+            for p in main_folder.rglob("*"):
+                if p.name == executable_name and p.is_file():
+                    logging.info(f"Found executable: {p}")
+                    return p
         logging.error(f"Executable {executable_name} not found in {main_folder}")
         raise FileNotFoundError(f"{executable_name} not found in {main_folder}")
 
@@ -61,17 +89,31 @@ class ConsoleTestUtils:
             os.chmod(directory, 0o755)
 
     @staticmethod
-    def run_conversion(*args: str) -> str:
+    def run_conversion(
+        *args: str,
+        timeout: Optional[float] = None,
+        cpu_limit: Optional[float] = None,
+        memory_limit: Optional[float] = None,
+    ) -> str:
         """Runs the conversion command and returns the output.
 
         Args:
             *args (str): The command arguments.
+            timeout (float, optional): Wall-clock limit in seconds. The whole process
+                group is killed when it is exceeded.
+            cpu_limit (float, optional): CPU-seconds limit, applied as RLIMIT_CPU.
+            memory_limit (float, optional): Resident memory limit in MB. Where the
+                tool's resident memory can be read (Linux), it is sampled every
+                MEMORY_POLL_INTERVAL seconds and the tool is killed once it exceeds
+                the limit. Elsewhere it falls back to RLIMIT_AS, and running out of
+                memory then shows up as an ordinary conversion failure.
 
         Returns:
             str: The command output.
 
         Raises:
             AuthorizationError: If authorization fails.
+            ResourceLimitError: If the conversion exceeds one of its limits.
             RuntimeError: If the conversion fails.
         """
         print(f"\nRunning command: {' '.join(args)}")
@@ -109,28 +151,204 @@ class ConsoleTestUtils:
                 proc.terminate()
 
         try:
-            proc = subprocess.Popen(
-                args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
-            )
-            stop_event = threading.Event()
-            exception_container: List[Exception] = []
-            monitor_thread = threading.Thread(
-                target=monitor_stdout, args=(proc, stop_event, exception_container)
-            )
-            monitor_thread.start()
-            monitor_thread.join()
-            stdout, stderr = proc.communicate()
-            if exception_container:
-                raise exception_container[0]
-            if proc.returncode != 0 or stop_event.is_set():
-                raise subprocess.CalledProcessError(
-                    proc.returncode, args, output=stdout, stderr=stderr
+            with timer.span("run_conversion", executable=args[0]):
+                rss_limit = None
+                if memory_limit is not None and ConsoleTestUtils.can_limit_memory():
+                    rss_limit = int(memory_limit * 1024 * 1024)
+                    memory_limit = None  # enforced by sampling, not by RLIMIT_AS
+                isolate = (timeout is not None or rss_limit is not None) and (
+                    platform.system() != "Windows"
+                )
+                proc = subprocess.Popen(
+                    args,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    preexec_fn=ConsoleTestUtils.limit_resources(cpu_limit, memory_limit),
+                    start_new_session=isolate,
+                )
+                deadline = None if timeout is None else time.monotonic() + timeout
+                stop_event = threading.Event()
+                exception_container: List[Exception] = []
+                stderr_chunks: List[str] = []
+                assert proc.stdout is not None and proc.stderr is not None
+                stdout_pipe, stderr_pipe = proc.stdout, proc.stderr
+                monitor_thread = threading.Thread(
+                    target=monitor_stdout,
+                    args=(proc, stop_event, exception_container),
+                    daemon=True,
                 )
-            return stdout
+                stderr_thread = threading.Thread(
+                    target=lambda: stderr_chunks.append(stderr_pipe.read()), daemon=True
+                )
+                monitor_thread.start()
+                stderr_thread.start()
+                try:
+                    while monitor_thread.is_alive():
+                        monitor_thread.join(
+                            ConsoleTestUtils.poll_interval(deadline, rss_limit)
+                        )
+                        ConsoleTestUtils.check_limits(proc, deadline, timeout, rss_limit)
+                    cpu_time = ConsoleTestUtils.wait_process(proc, deadline, timeout, rss_limit)
+                except ResourceLimitError:
+                    ConsoleTestUtils.kill_process(proc, isolate)
+                    proc.wait()
+                    # A grandchild that escaped the kill may still hold the pipes open.
+                    monitor_thread.join(KILL_GRACE_PERIOD)
+                    stderr_thread.join(KILL_GRACE_PERIOD)
+                    raise
+                stdout = stdout_pipe.read()
+                stderr_thread.join()
+                stderr = "".join(stderr_chunks)
+                violated = ConsoleTestUtils.violated_limit(proc.returncode, cpu_time, cpu_limit)
+                if violated:
+                    raise ResourceLimitError(
+                        violated, f"Conversion exceeded its {violated} (exit code {proc.returncode})"
+                    )
+                if exception_container:
+                    raise exception_container[0]
+                if proc.returncode != 0 or stop_event.is_set():
+                    raise subprocess.CalledProcessError(
+                        proc.returncode, args, output=stdout, stderr=stderr
+                    )
+                return stdout
         except subprocess.CalledProcessError as e:
             e_error = e.stderr if e.stderr else e.output
             raise RuntimeError(f"Conversion failed: {e_error}")
 
+    @staticmethod
+    def limit_resources(cpu_limit: Optional[float], memory_limit: Optional[float]):
+        """Builds a preexec_fn applying the CPU and memory rlimits in the child process."""
+        if cpu_limit is None and memory_limit is None:
+            return None
+        if resource is None:
+            logging.warning("CPU and memory limits are not supported on this platform")
+            return None
+
+        def apply_limits() -> None:
+            if cpu_limit is not None:
+                # SIGXCPU at the soft limit, SIGKILL one second later.
+                seconds = max(int(cpu_limit), 1)
+                resource.setrlimit(resource.RLIMIT_CPU, (seconds, seconds + 1))
+            if memory_limit is not None:
+                limit = int(memory_limit * 1024 * 1024)
+                resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+        return apply_limits
+
+    @staticmethod
+    def can_limit_memory() -> bool:
+        """Checks whether the resident memory of a child process can be sampled."""
+        return os.path.exists("/proc/self/statm")
+
+    @staticmethod
+    def resident_memory(pid: int) -> Optional[int]:
+        """Returns the resident memory of a process in bytes, or None if it cannot be read."""
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                resident_pages = int(f.read().split()[1])
+        except (OSError, IndexError, ValueError):
+            return None
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+    @staticmethod
+    def poll_interval(deadline: Optional[float], rss_limit: Optional[int]) -> Optional[float]:
+        """How long to block before the limits of a running tool must be checked again."""
+        interval = MEMORY_POLL_INTERVAL if rss_limit is not None else None
+        if deadline is not None:
+            remaining = max(deadline - time.monotonic(), 0)
+            interval = remaining if interval is None else min(interval, remaining)
+        return interval
+
+    @staticmethod
+    def check_limits(
+        proc: subprocess.Popen,
+        deadline: Optional[float],
+        timeout: Optional[float],
+        rss_limit: Optional[int],
+    ) -> None:
+        """Raises ResourceLimitError if a running tool is past its deadline or memory limit."""
+        if deadline is not None and time.monotonic() >= deadline:
+            raise ResourceLimitError("timeout", f"Conversion timed out after {timeout} seconds")
+        if rss_limit is not None:
+            resident = ConsoleTestUtils.resident_memory(proc.pid)
+            if resident is not None and resident > rss_limit:
+                raise ResourceLimitError(
+                    "memory_limit",
+                    f"Conversion exceeded its memory_limit ({resident // (1024 * 1024)} MB resident)",
+                )
+
+    @staticmethod
+    def wait_process(
+        proc: subprocess.Popen,
+        deadline: Optional[float],
+        timeout: Optional[float] = None,
+        rss_limit: Optional[int] = None,
+    ) -> Optional[float]:
+        """Reaps the process, still enforcing its limits, and returns the CPU seconds it used.
+
+        The CPU time comes from ``os.wait4`` and is None where that is unavailable,
+        or when ``Popen`` already reaped the process (``terminate`` polls it).
+
+        Raises:
+            ResourceLimitError: If the process passes its deadline or memory limit first.
+        """
+        while True:
+            if hasattr(os, "wait4"):
+                try:
+                    pid, status, usage = os.wait4(proc.pid, os.WNOHANG)
+                except ChildProcessError:
+                    proc.wait()
+                    return None
+                if pid:
+                    proc.returncode = os.waitstatus_to_exitcode(status)
+                    return usage.ru_utime + usage.ru_stime
+            elif proc.poll() is not None:
+                return None
+            ConsoleTestUtils.check_limits(proc, deadline, timeout, rss_limit)
+            time.sleep(0.01)
+
+    @staticmethod
+    def kill_process(proc: subprocess.Popen, process_group: bool) -> None:
+        """Kills the process with its children.
+
+        On POSIX the whole process group is killed when the process runs in its own
+        session. On Windows ``taskkill /T`` ends the process tree.
+        """
+        logging.warning(f"Killing process {proc.pid}")
+        if platform.system() == "Windows":
+            result = subprocess.run(
+                ["taskkill", "/T", "/F", "/PID", str(proc.pid)], capture_output=True
+            )
+            if result.returncode != 0 and proc.poll() is None:
+                proc.kill()
+            return
+        try:
+            if process_group:
+                os.killpg(proc.pid, signal.SIGKILL)
+            else:
+                proc.kill()
+        except ProcessLookupError:
+            pass
+
+    @staticmethod
+    def violated_limit(
+        returncode: int, cpu_time: Optional[float], cpu_limit: Optional[float]
+    ) -> Optional[str]:
+        """Works out whether a failed process was stopped by its CPU limit.
+
+        Only SIGXCPU, or a CPU time that reached the limit (the hard limit SIGKILLs
+        tools that ignore SIGXCPU), counts as a violation. Any other exit is left
+        to be reported as an ordinary failure.
+        """
+        if returncode == 0 or cpu_limit is None or resource is None:
+            return None
+        if returncode == -signal.SIGXCPU:
+            return "cpu_limit"
+        if cpu_time is not None and cpu_time >= max(int(cpu_limit), 1):
+            return "cpu_limit"
+        return None
+
     @staticmethod
     def get_executable(
         main_folder: Path, extract_to: Path, executable_name: str
@@ -152,9 +370,15 @@ class ConsoleTestUtils:
 
     # TODO: Add the compare_argument method to the ConsoleTestUtils class.
     @staticmethod
-    def compare_argument(executable: str, help_argument: str):
+    def compare_argument(executable: str, help_argument: str, timeout: Optional[float] = None):
         """Compares the help argument with the actual output."""
-        result = subprocess.run([executable, "--help"], capture_output=True, text=True)
+        with timer.span("compare_argument"):
+            try:
+                result = subprocess.run(
+                    [executable, "--help"], capture_output=True, text=True, timeout=timeout
+                )
+            except subprocess.TimeoutExpired:
+                raise ResourceLimitError("timeout", f"--help timed out after {timeout} seconds")
         actual_output = result.stdout
         # Normalize whitespace and compare
         actual_normalized = " ".join(actual_output.split())
@@ -180,7 +404,7 @@ class ConsoleTestUtils:
                     shutil.rmtree(directories)
 
     @staticmethod
-    def read_runspec_file(runspec_file: Path) -> Optional[List[dict]]:
+    def read_runspec_file(runspec_file: Path) -> dict:
         """Reads a runspec JSON file."""
         logging.info(f"Reading configuration file: {runspec_file}")
         try:
@@ -0,0 +1,270 @@
+import json
+import logging
+import os
+import re
+from itertools import chain
+from pathlib import Path
+from typing import Iterator, Optional, Pattern
+
+from console_test_runner.utils.helper import ConsoleTestUtils
+from console_test_runner.utils.sm_helper import SMHelper
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+MATRIX_KEY = "matrix"
+
+
+class RunspecLoader:
+    """Loads runspec files and yields their test cases one at a time.
+
+    Two formats are supported:
+
+    * ``.json``: the classic runspec with ``general`` and ``tests`` keys, plus
+      an optional ``matrix`` list of matrix declarations.
+    * ``.jsonl``: one JSON object per line. The first line holds
+      ``{"general": {...}}``; every following line is either a test case or a
+      ``{"matrix": {...}}`` declaration. The file is streamed, so memory use does
+      not grow with the number of tests.
+
+    A matrix declaration expands lazily into one test case per input file
+    matched by its ``inputs`` glob(s) and per entry of its ``arguments`` list.
+    The placeholders ``{stem}``, ``{input}`` and ``{variant}`` are substituted in
+    ``name`` and ``output``. All other keys are copied into every test case.
+
+    Test names must be unique across the whole suite. Checking this keeps the
+    names seen so far in memory, which is the only state that grows with the
+    number of tests.
+    """
+
+    def __init__(self, runspec_file: Path):
+        self.runspec_file = Path(runspec_file)
+        self.streaming = self.runspec_file.suffix == ".jsonl"
+        self._data: Optional[dict] = None
+
+    def _load(self) -> dict:
+        if self._data is None:
+            self._data = ConsoleTestUtils.read_runspec_file(self.runspec_file)
+        return self._data
+
+    def reload(self) -> None:
+        """Forgets the cached runspec content so the next access reads the file again."""
+        self._data = None
+
+    def _iter_lines(self) -> Iterator[dict]:
+        with self.runspec_file.open("r") as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    logging.error(
+                        f"Invalid JSON on line {line_number} of {self.runspec_file}: {e}"
+                    )
+                    raise ValueError(f"Invalid JSON format on line {line_number}: {e}")
+
+    def general(self) -> dict:
+        """Returns the unresolved ``general`` section of the runspec."""
+        general: dict
+        if not self.streaming:
+            general = self._load()["general"]
+            return general
+        for entry in self._iter_lines():
+            if "general" not in entry:
+                raise ValueError(
+                    f"The first entry of {self.runspec_file} must be the 'general' section"
+                )
+            general = entry["general"]
+            return general
+        raise ValueError(f"Runspec file {self.runspec_file} is empty")
+
+    def input_dir(self) -> Path:
+        """Returns the resolved input folder that matrix globs are relative to."""
+        return Path(SMHelper.resolve_keywords(self.general()["input_folder"])).resolve()
+
+    def iter_tests(self, input_dir: Optional[Path] = None) -> Iterator[dict]:
+        """Yields unresolved test cases, expanding matrix declarations as they are reached.
+
+        Raises:
+            ValueError: If two test cases, explicit or generated, share a name.
+        """
+        seen_names = set()
+        for test_case in self._iter_entries(input_dir):
+            if test_case.get("name") in seen_names:
+                raise ValueError(
+                    f"Duplicate test name in {self.runspec_file}: '{test_case['name']}'; "
+                    "use {input} in matrix names to keep them unique"
+                )
+            seen_names.add(test_case.get("name"))
+            yield test_case
+
+    def iter_matrix_inputs(self, input_dir: Optional[Path] = None) -> Iterator[str]:
+        """Yields the input files matched by each matrix declaration, in expansion order.
+
+        The generated tests change whenever these do, so cached plans are keyed by them.
+        """
+        for entry in self._iter_raw_entries():
+            if MATRIX_KEY in entry:
+                if input_dir is None:
+                    input_dir = self.input_dir()
+                yield from self.matrix_inputs(entry[MATRIX_KEY], input_dir)
+
+    def _iter_raw_entries(self) -> Iterator[dict]:
+        if self.streaming:
+            entries = self._iter_lines()
+            next(entries, None)  # skip the general section
+            yield from entries
+        else:
+            data = self._load()
+            yield from chain(
+                data.get("tests", []),
+                ({MATRIX_KEY: matrix} for matrix in data.get(MATRIX_KEY, [])),
+            )
+
+    def _iter_entries(self, input_dir: Optional[Path]) -> Iterator[dict]:
+        for entry in self._iter_raw_entries():
+            if MATRIX_KEY in entry:
+                if input_dir is None:
+                    input_dir = self.input_dir()
+                yield from self.expand_matrix(entry[MATRIX_KEY], input_dir)
+            else:
+                yield entry
+
+    @staticmethod
+    def expand_matrix(matrix: dict, input_dir: Path) -> Iterator[dict]:
+        """Expands a matrix declaration into test cases (input globs x argument lists).
+
+        Args:
+            matrix (dict): The declaration. ``name`` and ``inputs`` are required.
+            input_dir (Path): The directory the ``inputs`` globs are relative to.
+
+        Yields:
+            dict: One test case per matched input file and argument list.
+
+        Raises:
+            ValueError: If the declaration is malformed.
+        """
+        if "name" not in matrix or "inputs" not in matrix:
+            raise ValueError("A matrix declaration needs both 'name' and 'inputs'")
+        argument_sets = matrix.get("arguments", [[]])
+        if not isinstance(argument_sets, list) or not all(
+            isinstance(arguments, list) for arguments in argument_sets
+        ):
+            raise ValueError(
+                f"Matrix '{matrix['name']}': 'arguments' must be a list of argument lists, "
+                'e.g. [["--force"], ["--force", "--types"]]'
+            )
+        template = {
+            key: value
+            for key, value in matrix.items()
+            if key not in ("name", "inputs", "output", "arguments")
+        }
+
+        for relative_input in RunspecLoader.matrix_inputs(matrix, input_dir):
+            stem = Path(relative_input).stem
+            for variant, arguments in enumerate(argument_sets):
+                placeholders = {
+                    "{stem}": stem,
+                    "{input}": relative_input,
+                    "{variant}": str(variant),
+                }
+                test_case = dict(template)
+                test_case["name"] = _substitute(matrix["name"], placeholders)
+                test_case["inputs"] = relative_input
+                test_case["arguments"] = list(arguments)
+                if "output" in matrix:
+                    test_case["output"] = _substitute(matrix["output"], placeholders)
+                yield test_case
+
+    @staticmethod
+    def matrix_inputs(matrix: dict, input_dir: Path) -> Iterator[str]:
+        """Yields the input files matched by a matrix declaration's ``inputs`` glob(s).
+
+        Matches are yielded in sorted order, relative to input_dir, so test order
+        and ids are the same on every machine. The directories are walked lazily,
+        one sorted listing at a time, so the first match is yielded before the whole
+        dataset is scanned. A file matched by more than one pattern is yielded once.
+        """
+        if "inputs" not in matrix:
+            raise ValueError("A matrix declaration needs both 'name' and 'inputs'")
+        patterns = matrix["inputs"]
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        matchers = [_compile_glob(pattern) for pattern in patterns]
+        for index, pattern in enumerate(patterns):
+            for relative_input in _iter_glob(input_dir, pattern):
+                if any(matcher.fullmatch(relative_input) for matcher in matchers[:index]):
+                    continue  # already yielded for an earlier pattern
+                yield relative_input
+
+
+def _compile_glob(pattern: str) -> Pattern[str]:
+    """Translates a glob pattern into a regex for '/'-separated relative paths."""
+    pattern_regex = ""
+    for segment in pattern.split("/"):
+        if segment == "**":
+            pattern_regex += "(?:[^/]+/)*"
+            continue
+        regex = ""
+        i = 0
+        while i < len(segment):
+            char = segment[i]
+            end = segment.find("]", i + 2) if char == "[" else -1
+            if char == "*":
+                regex += "[^/]*"
+            elif char == "?":
+                regex += "[^/]"
+            elif end != -1:
+                group = segment[i + 1:end]
+                if group.startswith("!"):
+                    group = "^" + group[1:]
+                regex += f"[{group}]"
+                i = end
+            else:
+                regex += re.escape(char)
+            i += 1
+        pattern_regex += regex + "/"
+    return re.compile(pattern_regex[:-1] if pattern_regex.endswith("/") else pattern_regex)
+
+
+def _iter_glob(root: Path, pattern: str) -> Iterator[str]:
+    """Yields the files under root matching pattern, as relative posix paths in sorted order.
+
+    Unlike ``sorted(root.glob(pattern))`` this lists one directory at a time, so
+    memory use depends on the directory depth, not on the size of the dataset.
+    Directories that cannot match the fixed leading segments are not entered.
+    """
+    segments = pattern.split("/")
+    matcher = _compile_glob(pattern)
+    recursive = "**" in segments
+    fixed = segments[: segments.index("**")] if recursive else segments[:-1]
+    fixed_matchers = [_compile_glob(segment) for segment in fixed]
+
+    def walk(directory: Path, prefix: str, depth: int) -> Iterator[str]:
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except (FileNotFoundError, NotADirectoryError):
+            return
+        for entry in entries:
+            relative = prefix + entry.name
+            if entry.is_dir():
+                if depth < len(fixed_matchers):
+                    if not fixed_matchers[depth].fullmatch(entry.name):
+                        continue
+                elif not recursive or entry.is_symlink():
+                    continue  # like Path.glob, ** does not follow symlinked directories
+                yield from walk(Path(entry.path), relative + "/", depth + 1)
+            elif entry.is_file() and matcher.fullmatch(relative):
+                yield relative
+
+    yield from walk(root, "", 0)
+
+
+def _substitute(template: str, placeholders: dict) -> str:
+    for placeholder, value in placeholders.items():
+        template = template.replace(placeholder, value)
+    return template
@@ -1,4 +1,5 @@
 import platform
+from functools import lru_cache
 from pathlib import Path
 from inspect import currentframe
 from os import environ
@@ -8,6 +9,8 @@ import re
 class SMHelper:
     """Utility class for SM-specific functions."""
 
+    KEYWORDS = ("{ROOT}", "{RESOLVE_BASE}", "{_FILE_}")
+
     @staticmethod
     def resolve_paths(parameters: dict) -> Path:
         """Check the existence of input and output folders, and get their full path.
@@ -64,15 +67,27 @@ class SMHelper:
         return root_folder
 
 
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def keyword_values(eod_base) -> tuple:
+        """Returns the escaped ({ROOT}, {RESOLVE_BASE}, {_FILE_}) replacements.
+
+        Cached per EOD_BASE value so large runspecs do not walk the filesystem for every string.
+        """
+        root_path = str(SMHelper.find_xplat_root()).replace("\\", "\\\\")
+        base_path = str(SMHelper.resolve_paths(
+            {"input_local_dir_bool": False, "input_folder_dir": ""}
+        )).replace("\\", "\\\\")
+        file_path = str(Path(__file__).resolve().parent).replace("\\", "\\\\")
+        return root_path, base_path, file_path
+
     @staticmethod
     def resolve_keywords(value):
         """Recursively resolve {ROOT}, {RESOLVE_BASE}, and {_FILE_} keywords in config values."""
         if isinstance(value, str):
-            root_path = str(SMHelper.find_xplat_root()).replace("\\", "\\\\") 
-            base_path = str(SMHelper.resolve_paths(
-                {"input_local_dir_bool": False, "input_folder_dir": ""}
-            )).replace("\\", "\\\\") 
-            file_path = str(Path(__file__).resolve().parent).replace("\\", "\\\\")  
+            if not any(keyword in value for keyword in SMHelper.KEYWORDS):
+                return value
+            root_path, base_path, file_path = SMHelper.keyword_values(environ.get("EOD_BASE"))
 
             value = re.sub(r"\{ROOT\}", root_path, value)
             value = re.sub(r"\{RESOLVE_BASE\}", base_path, value)
@@ -0,0 +1,141 @@
+import cProfile
+import csv
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+class _NullSpan:
+    """Context manager returned while timing is disabled; does nothing."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("timer", "name", "args", "start", "profiler")
+
+    def __init__(self, timer: "PhaseTimer", name: str, args: dict):
+        self.timer = timer
+        self.name = name
+        self.args = args
+        self.profiler = timer.profiler if name == timer.profile_phase else None
+
+    def __enter__(self):
+        if self.profiler is not None:
+            self.profiler.enable()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end = time.perf_counter_ns()
+        if self.profiler is not None:
+            self.profiler.disable()
+        self.timer.spans.append(
+            (self.name, self.start, end - self.start, threading.get_ident(), self.args)
+        )
+        return False
+
+
+class PhaseTimer:
+    """Records timing spans for the phases of the runner pipeline.
+
+    Spans are measured with the monotonic ``perf_counter_ns`` clock. While the
+    timer is disabled, ``span`` returns a shared no-op context manager, so the
+    instrumentation costs a single attribute check per phase.
+
+    Optionally one phase name can be profiled with cProfile. Every span of that
+    phase is profiled into the same ``cProfile.Profile``.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.spans: List[Tuple[str, int, int, int, dict]] = []
+        self.profile_phase: Optional[str] = None
+        self.profiler: Optional[cProfile.Profile] = None
+
+    def enable(self, profile_phase: Optional[str] = None) -> None:
+        """Starts recording spans, optionally profiling the given phase."""
+        self.enabled = True
+        self.profile_phase = profile_phase
+        self.profiler = cProfile.Profile() if profile_phase else None
+
+    def disable(self) -> None:
+        """Stops recording spans and discards the recorded ones."""
+        self.enabled = False
+        self.spans = []
+        self.profile_phase = None
+        self.profiler = None
+
+    def span(self, name: str, **args):
+        """Returns a context manager timing the named phase."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def export(self, path: Union[str, Path]) -> None:
+        """Exports spans as a Chrome trace for ``.json`` paths, CSV otherwise."""
+        path = Path(path)
+        if path.suffix == ".json":
+            self.export_chrome_trace(path)
+        else:
+            self.export_csv(path)
+
+    def export_chrome_trace(self, path: Union[str, Path]) -> None:
+        """Writes the spans in the Chrome trace event format (chrome://tracing, Perfetto)."""
+        pid = os.getpid()
+        events = [
+            {
+                "name": name,
+                "cat": "console_test_runner",
+                "ph": "X",
+                "ts": start / 1000,
+                "dur": duration / 1000,
+                "pid": pid,
+                "tid": thread,
+                "args": args,
+            }
+            for name, start, duration, thread, args in self.spans
+        ]
+        with Path(path).open("w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        logging.info(f"Wrote {len(events)} timing spans to {path}")
+
+    def export_csv(self, path: Union[str, Path]) -> None:
+        """Writes the spans as a flat CSV table with times in microseconds."""
+        with Path(path).open("w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["phase", "start_us", "duration_us", "thread", "args"])
+            for name, start, duration, thread, args in self.spans:
+                writer.writerow(
+                    [name, start / 1000, duration / 1000, thread, json.dumps(args, default=str)]
+                )
+        logging.info(f"Wrote {len(self.spans)} timing spans to {path}")
+
+    def save_profile(self, path: Union[str, Path]) -> None:
+        """Dumps the cProfile statistics of the profiled phase (readable with pstats)."""
+        if self.profiler is None:
+            raise ValueError("No phase is being profiled")
+        self.profiler.dump_stats(str(path))
+        logging.info(f"Wrote {self.profile_phase} profile to {path}")
+
+
+# Shared recorder used by ConsoleTestRunner and ConsoleTestUtils.
+timer = PhaseTimer()
@@ -0,0 +1,284 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import platform
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from console_test_runner.plan import TestPlan
+from console_test_runner.utils.sm_helper import SMHelper
+from console_test_runner.utils.timing import timer
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+# IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+# | IN_DELETE_SELF | IN_MOVE_SELF
+_IN_MASK = 0x002 | 0x004 | 0x008 | 0x040 | 0x080 | 0x100 | 0x200 | 0x400 | 0x800
+_IN_DELETE_SELF = 0x400
+_IN_MOVE_SELF = 0x800
+_IN_Q_OVERFLOW = 0x4000
+_IN_IGNORED = 0x8000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class _PollingBackend:
+    """Wakes up every interval; every watched file has to be checked with stat."""
+
+    def watch(self, directories: Iterable[Path]) -> Set[Path]:
+        return set()
+
+    def wait(self, timeout: float) -> Optional[Set[Path]]:
+        time.sleep(timeout)
+        return None
+
+    def close(self) -> None:
+        pass
+
+
+class _InotifyBackend:
+    """Blocks on Linux inotify events and reports which paths they touched."""
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._directories: Dict[int, Path] = {}
+        self._watched: Set[Path] = set()
+
+    def watch(self, directories: Iterable[Path]) -> Set[Path]:
+        """Adds a watch on each directory not watched yet. Returns the newly watched ones."""
+        added = set()
+        for directory in directories:
+            if directory in self._watched or not directory.is_dir():
+                continue
+            wd = self._libc.inotify_add_watch(
+                self._fd, os.fsencode(str(directory)), _IN_MASK
+            )
+            if wd < 0:
+                logging.warning(f"Cannot watch {directory}: {os.strerror(ctypes.get_errno())}")
+                continue
+            self._directories[wd] = directory
+            self._watched.add(directory)
+            added.add(directory)
+        return added
+
+    def wait(self, timeout: float) -> Optional[Set[Path]]:
+        """Returns the touched paths, or None if events were lost and everything must be checked."""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        touched: Set[Path] = set()
+        rescan = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            rescan |= self.parse_events(data, touched)
+        return None if rescan else touched
+
+    def parse_events(self, data: bytes, touched: Set[Path]) -> bool:
+        """Adds the paths named by raw inotify events to touched.
+
+        Returns True when events may have been lost: the queue overflowed, or a
+        watched directory was deleted or moved away and its watch is gone.
+        """
+        rescan = False
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & _IN_Q_OVERFLOW:
+                logging.warning("inotify event queue overflowed, checking every watched file")
+                rescan = True
+            elif mask & (_IN_DELETE_SELF | _IN_MOVE_SELF | _IN_IGNORED):
+                directory = self._directories.pop(wd, None)
+                if directory is not None:
+                    # A moved directory keeps its watch, drop it so the path can be watched again.
+                    if not mask & _IN_IGNORED:
+                        self._libc.inotify_rm_watch(self._fd, wd)
+                    self._watched.discard(directory)
+                    logging.info(f"Stopped watching {directory}, it was removed")
+                    rescan = True
+            elif wd in self._directories and name:
+                touched.add(self._directories[wd] / os.fsdecode(name))
+        return rescan
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def _create_backend():
+    if platform.system() == "Linux":
+        try:
+            return _InotifyBackend()
+        except (OSError, AttributeError) as e:
+            logging.info(f"inotify unavailable ({e}), falling back to polling")
+    return _PollingBackend()
+
+
+def _stat(path: Path):
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class TestWatcher:
+    """Re-runs the tests affected by changes to the executable, the runspec or the inputs.
+
+    The runner is kept in memory between runs. A changed executable re-runs every
+    test, an edited runspec re-runs the added or modified cases (or everything
+    if the general section changed) and a changed input file re-runs the cases
+    that reference it.
+    """
+
+    __test__ = False  # not a pytest test class
+
+    def __init__(self, runner, interval: float = 0.5, settle: float = 0.1, use_inotify: bool = True):
+        self.runner = runner
+        self.interval = interval
+        self.settle = settle
+        self.backend = _create_backend() if use_inotify else _PollingBackend()
+        self.test_cases: Dict[str, dict] = {}
+        self.plans: Dict[str, TestPlan] = {}
+        self.dependents: Dict[Path, Set[str]] = {}
+        self.snapshot: Dict[Path, Optional[tuple]] = {}
+        self._load_tests()
+
+    def _load_tests(self) -> None:
+        # The loader rejects duplicate test names, so keying by name loses nothing.
+        test_cases = {test["name"]: test for test in self.runner.iter_tests()}
+        plans = {name: self.runner.compile_test(test) for name, test in test_cases.items()}
+        dependents: Dict[Path, Set[str]] = {}
+        for name, plan in plans.items():
+            for input_file in plan.input_files:
+                dependents.setdefault(input_file, set()).add(name)
+        self.test_cases, self.plans, self.dependents = test_cases, plans, dependents
+        self.snapshot = {path: _stat(path) for path in self.watched_paths()}
+        self._refresh_watches()
+
+    def watched_paths(self) -> Set[Path]:
+        """The executable, the runspec and every input file referenced by a test."""
+        return {
+            Path(self.runner.environment["executable"]),
+            self.runner.runspec_file.resolve(),
+            *self.dependents,
+        }
+
+    def _refresh_watches(self) -> Set[Path]:
+        """Watches the folder of every watched path. Returns the newly watched folders.
+
+        A folder that does not exist (yet) is covered by watching its nearest
+        existing ancestor, so its creation is noticed and it is watched on the
+        next call. Folders whose watch was lost, e.g. by a clean rebuild, are
+        watched again the same way.
+        """
+        directories = set()
+        for directory in {path.parent for path in self.snapshot}:
+            while not directory.is_dir() and directory.parent != directory:
+                directory = directory.parent
+            directories.add(directory)
+        return self.backend.watch(directories)
+
+    def poll(self, timeout: Optional[float] = None) -> Set[Path]:
+        """Waits up to timeout for changes and returns the watched paths that changed."""
+        touched = self.backend.wait(self.interval if timeout is None else timeout)
+        candidates = set(self.snapshot) if touched is None else touched & self.snapshot.keys()
+        if candidates and self.settle:
+            # Let builds and editors finish writing before comparing.
+            time.sleep(self.settle)
+            more = self.backend.wait(0)
+            if more is None:
+                candidates = set(self.snapshot)
+            else:
+                candidates |= more & self.snapshot.keys()
+        # Files written into a folder before its new watch was in place only show up in a stat.
+        added = self._refresh_watches()
+        if added:
+            candidates |= {path for path in self.snapshot if path.parent in added}
+        if not candidates:
+            return set()
+        changed = set()
+        for path in candidates:
+            state = _stat(path)
+            if state != self.snapshot[path]:
+                self.snapshot[path] = state
+                changed.add(path)
+        return changed
+
+    def affected_tests(self, changed: Set[Path]) -> List[str]:
+        """Works out which tests must re-run for the changed paths, reloading the runspec if needed."""
+        affected = set()
+        run_all = False
+        if self.runner.runspec_file.resolve() in changed:
+            old_cases = self.test_cases
+            old_config, old_environment = self.runner.test_config, self.runner.environment
+            try:
+                self.runner.loader.reload()
+                config = self.runner.load_config()
+                if SMHelper.resolve_keywords(config) != old_config:
+                    logging.info("General section changed, setting up the environment again")
+                    # setup_environment resolves runner.test_config in place.
+                    self.runner.test_config = config
+                    self.runner.environment = self.runner.setup_environment()
+                    run_all = True
+                self._load_tests()
+            except (KeyError, ValueError, RuntimeError, FileNotFoundError) as e:
+                # Keep running the previous runspec rather than a mix of old and new.
+                self.runner.test_config, self.runner.environment = old_config, old_environment
+                logging.error(f"Cannot reload {self.runner.runspec_file}: {e}")
+                return []
+            affected |= {
+                name for name, test in self.test_cases.items() if old_cases.get(name) != test
+            }
+        if Path(self.runner.environment["executable"]) in changed:
+            logging.info("Executable changed, re-running all tests")
+            run_all = True
+        for path in changed:
+            self.runner.checked_inputs.discard(path)
+            affected |= self.dependents.get(path, set())
+        return [name for name in self.test_cases if run_all or name in affected]
+
+    def run_tests(self, names: List[str]) -> int:
+        """Runs the named tests, logging failures instead of stopping. Returns the failure count."""
+        failed = 0
+        for name in names:
+            try:
+                with timer.span("test", test=name):
+                    self.runner.execute_test(self.plans[name])
+            except Exception as e:
+                failed += 1
+                logging.error(f"Test failed: {name} - {type(e).__name__}: {e}")
+        logging.info(f"Ran {len(names)} tests: {len(names) - failed} passed, {failed} failed")
+        return failed
+
+    def watch(self, max_runs: Optional[int] = None) -> None:
+        """Runs every test once, then re-runs affected tests whenever something changes."""
+        self.run_tests(list(self.test_cases))
+        runs = 1
+        logging.info(f"Watching {len(self.snapshot)} files for changes")
+        try:
+            while max_runs is None or runs < max_runs:
+                changed = self.poll()
+                if not changed:
+                    continue
+                logging.info(f"Changed: {', '.join(str(path) for path in sorted(changed))}")
+                names = self.affected_tests(changed)
+                if names:
+                    self.run_tests(names)
+                    runs += 1
+        finally:
+            self.backend.close()
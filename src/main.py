@@ -1,6 +1,12 @@
 import argparse
 import logging
+import sys
+from pathlib import Path
 from console_test_runner.test_runner import ConsoleTestRunner
+from console_test_runner.distributed import WORKER_TIMEOUT, TestCoordinator, TestWorker
+from console_test_runner.watch import TestWatcher
+from console_test_runner.utils.runspec_loader import RunspecLoader
+from console_test_runner.utils.timing import timer
 
 # Configure logging to print to console
 logging.basicConfig(
@@ -12,10 +18,99 @@ if __name__ == "__main__":
     parser.add_argument(
         "--runspec", required=True, help="Path to the runspec JSON file"
     )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--serve",
+        metavar="ADDRESS",
+        help="Serve the tests to workers on host:port or unix:/path/to.sock",
+    )
+    parser.add_argument(
+        "--worker-timeout",
+        type=float,
+        default=WORKER_TIMEOUT,
+        help="Seconds without a heartbeat after which a worker is considered lost "
+        f"and its test re-queued (default: {WORKER_TIMEOUT})",
+    )
+    mode.add_argument(
+        "--worker",
+        metavar="ADDRESS",
+        help="Pull and run tests from the coordinator at host:port or unix:/path/to.sock",
+    )
+    mode.add_argument(
+        "--plan",
+        action="store_true",
+        help="Print the compiled execution plan without running any test",
+    )
+    mode.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and re-run the tests affected by changes to the tool, runspec or inputs",
+    )
+    parser.add_argument(
+        "--watch-interval",
+        type=float,
+        default=0.5,
+        help="Seconds between change checks in --watch mode (default: 0.5)",
+    )
+    parser.add_argument(
+        "--plan-cache",
+        metavar="DIR",
+        help="Cache the compiled execution plan in DIR and reuse it on later runs",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="Record phase timings and write them to FILE (Chrome trace for .json, CSV otherwise)",
+    )
+    parser.add_argument(
+        "--profile-phase",
+        metavar="PHASE",
+        help="Profile every span of PHASE (e.g. run_conversion, compile) with cProfile",
+    )
+    parser.add_argument(
+        "--profile-output",
+        metavar="FILE",
+        help="Where to write the cProfile statistics (default: <PHASE>.prof)",
+    )
     args = parser.parse_args()
 
+    if args.trace or args.profile_phase:
+        timer.enable(profile_phase=args.profile_phase)
+
     logging.info("Starting Console Test Runner")
-    runner = ConsoleTestRunner(args.runspec)
-    runner.run_all_tests()
+    try:
+        if args.serve:
+            loader = RunspecLoader(Path(args.runspec))
+            # Workers resolve keywords against their own host layout.
+            results = TestCoordinator(
+                args.serve, loader.iter_tests(), worker_timeout=args.worker_timeout
+            ).serve()
+            failed = [r for r in results.values() if r["status"] != "passed"]
+            for result in failed:
+                logging.error(f"FAILED {result['name']} on {result['worker']}: {result['error']}")
+            logging.info(f"{len(results) - len(failed)} passed, {len(failed)} failed")
+            if failed:
+                sys.exit(1)
+        elif args.worker:
+            runner = ConsoleTestRunner(args.runspec)
+            TestWorker(args.worker, runner).run()
+        elif args.watch:
+            runner = ConsoleTestRunner(args.runspec)
+            try:
+                TestWatcher(runner, interval=args.watch_interval).watch()
+            except KeyboardInterrupt:
+                logging.info("Stopped watching")
+        elif args.plan:
+            runner = ConsoleTestRunner(args.runspec, plan_cache_dir=args.plan_cache)
+            plan = runner.plan if runner.plan is not None else runner.compile_plan()
+            print(plan.describe())
+        else:
+            runner = ConsoleTestRunner(args.runspec, plan_cache_dir=args.plan_cache)
+            runner.run_all_tests()
+    finally:
+        if args.trace:
+            timer.export(args.trace)
+        if args.profile_phase:
+            timer.save_profile(args.profile_output or f"{args.profile_phase}.prof")
 
     logging.info("Test execution completed")
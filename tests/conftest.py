@@ -0,0 +1,48 @@
+import json
+import pytest
+
+
+@pytest.fixture
+def tool_runspec(tmp_path):
+    """A runspec driving a shell script that writes its --output file."""
+    tool_dir = tmp_path / "tool"
+    tool_dir.mkdir()
+    tool = tool_dir / "convert"
+    tool.write_text('#!/bin/sh\necho converted > "$4"\n')
+    tool.chmod(0o755)
+    input_dir = tmp_path / "inputs"
+    input_dir.mkdir()
+    (input_dir / "test.eod").touch()
+    (input_dir / "other.eod").touch()
+
+    runspec_file = tmp_path / "runspec.json"
+    runspec_file.write_text(
+        json.dumps(
+            {
+                "general": {
+                    "tool_path": str(tool_dir),
+                    "input_folder": str(input_dir),
+                    "output_folder": str(tmp_path / "outputs"),
+                    "tool_name": "convert",
+                    "cleanup": True,
+                },
+                "tests": [
+                    {
+                        "name": "test_basic_conversion",
+                        "inputs": "test.eod",
+                        "output": "csv/result.csv",
+                        "arguments": ["--whitelist", "{INPUT}/whitelist.csv"],
+                    },
+                    {
+                        "name": "test_other_conversion",
+                        "inputs": "other.eod",
+                        "output": "csv/other.csv",
+                        "arguments": ["--force"],
+                    },
+                    {"name": "test_empty", "expect_error": True},
+                ],
+            },
+            indent=4,
+        )
+    )
+    return runspec_file
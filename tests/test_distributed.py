@@ -0,0 +1,175 @@
+import json
+import socket
+import threading
+import time
+import pytest
+from console_test_runner import distributed
+from console_test_runner.distributed import TestCoordinator, TestWorker, parse_address
+from console_test_runner.utils.timing import PhaseTimer
+
+
+class FakeRunner:
+    """Stands in for ConsoleTestRunner, failing any test named 'broken'."""
+
+    def __init__(self):
+        self.ran = []
+
+    def run_test(self, test_case):
+        self.ran.append(test_case["name"])
+        if test_case["name"] == "broken":
+            raise RuntimeError("Conversion failed")
+
+
+def start_workers(address, count):
+    runners = [FakeRunner() for _ in range(count)]
+    threads = [
+        threading.Thread(target=TestWorker(address, runner, name=f"w{i}").run)
+        for i, runner in enumerate(runners)
+    ]
+    for thread in threads:
+        thread.start()
+    return runners, threads
+
+
+def test_parse_address():
+    assert parse_address("localhost:5000") == (socket.AF_INET, ("localhost", 5000))
+    assert parse_address(":0") == (socket.AF_INET, ("127.0.0.1", 0))
+    assert parse_address("unix:/tmp/ctr.sock") == (socket.AF_UNIX, "/tmp/ctr.sock")
+    with pytest.raises(ValueError):
+        parse_address("localhost")
+
+
+def test_workers_run_all_tests_over_tcp():
+    tests = [{"name": f"test_{i}"} for i in range(20)] + [{"name": "broken"}]
+    coordinator = TestCoordinator("127.0.0.1:0", tests)
+    host, port = coordinator.start()
+    runners, threads = start_workers(f"{host}:{port}", 3)
+
+    assert coordinator.wait(timeout=10)
+    for thread in threads:
+        thread.join(timeout=10)
+    coordinator.shutdown()
+
+    assert len(coordinator.results) == len(tests)
+    assert sorted(sum((r.ran for r in runners), [])) == sorted(t["name"] for t in tests)
+    failed = [r for r in coordinator.results.values() if r["status"] == "failed"]
+    assert [r["name"] for r in failed] == ["broken"]
+    assert "Conversion failed" in failed[0]["error"]
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="requires Unix sockets")
+def test_lost_worker_test_is_requeued(tmp_path):
+    address = f"unix:{tmp_path / 'ctr.sock'}"
+    coordinator = TestCoordinator(address, [{"name": "test_a"}, {"name": "test_b"}])
+    coordinator.start()
+
+    # A worker that takes a test and disappears without reporting back.
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(tmp_path / "ctr.sock"))
+        stream = sock.makefile("rwb")
+        stream.write(b'{"type": "request"}\n')
+        stream.flush()
+        lost = json.loads(stream.readline())
+        stream.close()
+
+    runners, threads = start_workers(address, 1)
+    assert coordinator.wait(timeout=10)
+    threads[0].join(timeout=10)
+    coordinator.shutdown()
+
+    assert lost["test_case"]["name"] in runners[0].ran
+    assert sorted(runners[0].ran) == ["test_a", "test_b"]
+    assert all(r["status"] == "passed" for r in coordinator.results.values())
+
+
+def test_silent_worker_test_is_requeued():
+    coordinator = TestCoordinator("127.0.0.1:0", [{"name": "test_a"}], worker_timeout=0.5)
+    host, port = coordinator.start()
+
+    # A worker that takes a test and then hangs without closing its connection.
+    with socket.create_connection((host, port)) as sock:
+        stream = sock.makefile("rwb")
+        stream.write(b'{"type": "request"}\n')
+        stream.flush()
+        assert json.loads(stream.readline())["test_case"]["name"] == "test_a"
+
+        runners, threads = start_workers(f"{host}:{port}", 1)
+        assert coordinator.wait(timeout=10)
+        threads[0].join(timeout=10)
+    coordinator.shutdown()
+
+    assert runners[0].ran == ["test_a"]
+    assert coordinator.results[0]["worker"] == "w0"
+
+
+def test_worker_sends_heartbeats_while_busy():
+    class SlowRunner(FakeRunner):
+        def run_test(self, test_case):
+            time.sleep(1)
+            super().run_test(test_case)
+
+    coordinator = TestCoordinator("127.0.0.1:0", [{"name": "test_slow"}], worker_timeout=0.5)
+    host, port = coordinator.start()
+    runner = SlowRunner()
+    worker = TestWorker(f"{host}:{port}", runner, name="slow", heartbeat_interval=0.1)
+    thread = threading.Thread(target=worker.run)
+    thread.start()
+
+    assert coordinator.wait(timeout=10)
+    thread.join(timeout=10)
+    coordinator.shutdown()
+    assert coordinator.results[0]["worker"] == "slow"
+    assert runner.ran == ["test_slow"]
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="requires Unix sockets")
+def test_serve_twice_on_the_same_unix_socket(tmp_path):
+    path = tmp_path / "ctr.sock"
+    for _ in range(2):
+        coordinator = TestCoordinator(f"unix:{path}", [{"name": "test_a"}])
+        coordinator.start()
+        runners, threads = start_workers(f"unix:{path}", 1)
+        assert coordinator.wait(timeout=10)
+        threads[0].join(timeout=10)
+        coordinator.shutdown()
+        assert runners[0].ran == ["test_a"]
+        assert not path.exists()
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="requires Unix sockets")
+def test_stale_unix_socket_is_replaced(tmp_path):
+    path = tmp_path / "ctr.sock"
+    # The socket file of a coordinator that died without cleaning up.
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(path))
+    stale.close()
+    assert path.exists()
+
+    coordinator = TestCoordinator(f"unix:{path}", [{"name": "test_a"}])
+    coordinator.start()
+    # A live coordinator's socket is left alone.
+    with pytest.raises(OSError):
+        TestCoordinator(f"unix:{path}", []).start()
+    runners, threads = start_workers(f"unix:{path}", 1)
+    assert coordinator.wait(timeout=10)
+    threads[0].join(timeout=10)
+    coordinator.shutdown()
+    assert runners[0].ran == ["test_a"]
+
+
+def test_results_carry_phase_durations_while_timing(monkeypatch):
+    timer = PhaseTimer()
+    timer.enable()
+    monkeypatch.setattr(distributed, "timer", timer)
+
+    class PhasedRunner(FakeRunner):
+        def run_test(self, test_case):
+            with timer.span("run_conversion"):
+                super().run_test(test_case)
+
+    coordinator = TestCoordinator("127.0.0.1:0", [{"name": "test_a"}])
+    host, port = coordinator.start()
+    TestWorker(f"{host}:{port}", PhasedRunner(), name="w0").run()
+    assert coordinator.wait(timeout=10)
+    coordinator.shutdown()
+    assert set(coordinator.results[0]["phases"]) == {"run_conversion", "test"}
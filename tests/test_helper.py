@@ -4,8 +4,15 @@ import zipfile
 import tarfile
 import io
 from pathlib import Path
-from console_test_runner.utils.helper import ConsoleTestUtils
+from console_test_runner.utils.helper import ConsoleTestUtils, ResourceLimitError
 import shutil
+import platform
+import sys
+import time
+
+posix_only = pytest.mark.skipif(
+    platform.system() == "Windows", reason="requires POSIX process groups and rlimits"
+)
 
 
 def test_extract_package_zip(tmp_path):
@@ -115,3 +122,69 @@ def test_check_file_exists(tmp_path):
     # Test file not found
     with pytest.raises(FileNotFoundError):
         ConsoleTestUtils.check_file_exists(tmp_path / "non_existent_file")
+
+
+@posix_only
+def test_run_conversion_timeout_kills_process_group():
+    # The background sleep keeps stdout open, so only killing the whole group ends the run.
+    start = time.monotonic()
+    with pytest.raises(ResourceLimitError) as excinfo:
+        ConsoleTestUtils.run_conversion("sh", "-c", "sleep 30 & sleep 30", timeout=0.5)
+    assert excinfo.value.limit == "timeout"
+    assert time.monotonic() - start < 10
+
+
+@posix_only
+def test_run_conversion_cpu_limit():
+    with pytest.raises(ResourceLimitError) as excinfo:
+        ConsoleTestUtils.run_conversion(sys.executable, "-c", "while True: pass", cpu_limit=1)
+    assert excinfo.value.limit == "cpu_limit"
+
+
+@posix_only
+def test_run_conversion_cpu_limit_ignoring_sigxcpu():
+    # The hard limit SIGKILLs the tool; its CPU time shows the limit was reached.
+    code = "import signal; signal.signal(signal.SIGXCPU, signal.SIG_IGN)\nwhile True: pass"
+    with pytest.raises(ResourceLimitError) as excinfo:
+        ConsoleTestUtils.run_conversion(sys.executable, "-c", code, cpu_limit=1)
+    assert excinfo.value.limit == "cpu_limit"
+
+
+@posix_only
+@pytest.mark.parametrize(
+    "code",
+    [
+        "import os, signal; os.kill(os.getpid(), signal.SIGSEGV)",
+        "import os; os.abort()",
+        "import os, signal; os.kill(os.getpid(), signal.SIGKILL)",
+        "raise MemoryError()",
+    ],
+    ids=["sigsegv", "abort", "sigkill", "memory_error"],
+)
+def test_run_conversion_crash_under_limits_is_an_error(code):
+    with pytest.raises(RuntimeError) as excinfo:
+        ConsoleTestUtils.run_conversion(
+            sys.executable, "-c", code, cpu_limit=10, memory_limit=1024
+        )
+    assert not isinstance(excinfo.value, ResourceLimitError)
+
+
+@posix_only
+def test_run_conversion_within_limits():
+    # Completes without raising ResourceLimitError.
+    ConsoleTestUtils.run_conversion(
+        "echo", "Hello, World!", timeout=10, cpu_limit=10, memory_limit=1024
+    )
+
+
+@posix_only
+@pytest.mark.skipif(
+    not ConsoleTestUtils.can_limit_memory(), reason="resident memory cannot be sampled"
+)
+def test_run_conversion_memory_limit():
+    code = "import time; x = bytearray(256 * 1024 ** 2); time.sleep(30)"
+    start = time.monotonic()
+    with pytest.raises(ResourceLimitError) as excinfo:
+        ConsoleTestUtils.run_conversion(sys.executable, "-c", code, memory_limit=64)
+    assert excinfo.value.limit == "memory_limit"
+    assert time.monotonic() - start < 10
@@ -0,0 +1,139 @@
+import json
+import platform
+import pytest
+from console_test_runner.plan import ExecutionPlan, PlanCache, TestPlan
+from console_test_runner.test_runner import ConsoleTestRunner
+
+pytestmark = pytest.mark.skipif(
+    platform.system() == "Windows", reason="uses a shell script as the tool"
+)
+
+
+def test_compile_test(tool_runspec, tmp_path):
+    runner = ConsoleTestRunner(tool_runspec)
+    plan = runner.compile_test(
+        {"name": "test_basic", "inputs": "test.eod", "output": "result.csv", "arguments": ["{INPUT}/w.csv"]}
+    )
+
+    assert plan.argv == (
+        str(tmp_path / "tool" / "convert"),
+        "--input",
+        str(tmp_path / "inputs" / "test.eod"),
+        "--output",
+        str(tmp_path / "outputs" / "result.csv"),
+        f"{tmp_path / 'inputs'}/w.csv",
+    )
+    assert plan.cleanup and plan.check_output_exist and not plan.expect_error
+    assert plan.resources == (str(tmp_path / "outputs" / "result.csv"),)
+    with pytest.raises(AttributeError):
+        plan.name = "renamed"
+
+
+def test_compile_test_records_runspec_errors(tool_runspec):
+    plan = ConsoleTestRunner(tool_runspec).compile_test({"name": "test_empty"})
+    assert plan.argv == ()
+    assert "all empty" in plan.error
+
+
+def test_plan_cache_roundtrip(tool_runspec, tmp_path):
+    cache_dir = tmp_path / "cache"
+    compiled = ConsoleTestRunner(tool_runspec, plan_cache_dir=cache_dir).plan
+
+    cached = PlanCache(cache_dir).load(ExecutionPlan.compute_key(tool_runspec))
+    assert cached is not None
+    assert [t.to_dict() for t in cached.tests] == [t.to_dict() for t in compiled.tests]
+    assert cached.environment == compiled.environment
+
+    runner = ConsoleTestRunner(tool_runspec, plan_cache_dir=cache_dir)
+    runner.run_all_tests()
+    assert not (tmp_path / "outputs" / "csv" / "result.csv").exists()  # cleaned up
+
+
+def test_plan_cache_misses_when_runspec_changes(tool_runspec, tmp_path):
+    cache_dir = tmp_path / "cache"
+    ConsoleTestRunner(tool_runspec, plan_cache_dir=cache_dir)
+    key = ExecutionPlan.compute_key(tool_runspec)
+
+    tool_runspec.write_text(tool_runspec.read_text().replace("result.csv", "other.csv"))
+    assert ExecutionPlan.compute_key(tool_runspec) != key
+    assert PlanCache(cache_dir).load(ExecutionPlan.compute_key(tool_runspec)) is None
+
+
+def test_test_plan_to_dict_roundtrip():
+    plan = TestPlan(name="t", argv=("a", "b"), input_files=(), output_files=(), resources=())
+    assert TestPlan.from_dict(plan.to_dict()).to_dict() == plan.to_dict()
+
+
+def test_expect_error_matches_limits(tool_runspec, tmp_path):
+    runner = ConsoleTestRunner(tool_runspec)
+    hung = {"name": "test_hung", "inputs": "test.eod", "output": "hung.csv", "timeout": 0.5}
+    (tmp_path / "tool" / "convert").write_text("#!/bin/sh\nsleep 30\n")
+
+    assert runner.compile_test(hung).timeout == 0.5
+    runner.run_test({**hung, "expect_error": "timeout"})
+    with pytest.raises(RuntimeError):
+        runner.run_test({**hung, "expect_error": True})
+
+    plan = TestPlan(expect_error=["timeout", "error"])
+    assert plan.expects("timeout") and plan.expects("error") and not plan.expects("cpu_limit")
+
+
+def test_plan_cache_is_keyed_by_working_directory(tmp_path, monkeypatch):
+    runspec_file = tmp_path / "runspec.json"
+    runspec_file.write_text(
+        json.dumps(
+            {
+                "general": {
+                    "tool_path": "tool",
+                    "input_folder": "in",
+                    "output_folder": "out",
+                    "tool_name": "convert",
+                },
+                "tests": [{"name": "test_convert", "inputs": "x.eod", "output": "r.csv"}],
+            }
+        )
+    )
+    for workdir in ("A", "B"):
+        (tmp_path / workdir / "tool").mkdir(parents=True)
+        (tmp_path / workdir / "in").mkdir()
+        (tmp_path / workdir / "in" / "x.eod").touch()
+        tool = tmp_path / workdir / "tool" / "convert"
+        tool.write_text('#!/bin/sh\necho converted > "$4"\n')
+        tool.chmod(0o755)
+
+    cache_dir = tmp_path / "cache"
+    for workdir in ("A", "B"):
+        monkeypatch.chdir(tmp_path / workdir)
+        runner = ConsoleTestRunner(runspec_file, plan_cache_dir=cache_dir)
+        assert runner.environment["executable"] == tmp_path / workdir / "tool" / "convert"
+        runner.run_all_tests()
+
+    assert (tmp_path / "B" / "out" / "r.csv").exists()
+    assert len(list(cache_dir.iterdir())) == 2
+
+
+def test_plan_cache_misses_when_matrix_inputs_change(tool_runspec, tmp_path):
+    runspec = json.loads(tool_runspec.read_text())
+    runspec["matrix"] = [{"name": "matrix_{input}", "inputs": "*.eod", "output": "m/{stem}.csv"}]
+    tool_runspec.write_text(json.dumps(runspec))
+    cache_dir = tmp_path / "cache"
+    first = ConsoleTestRunner(tool_runspec, plan_cache_dir=cache_dir).plan
+    assert ConsoleTestRunner(tool_runspec, plan_cache_dir=cache_dir).plan.key == first.key
+
+    (tmp_path / "inputs" / "new.eod").touch()
+    plan = ConsoleTestRunner(tool_runspec, plan_cache_dir=cache_dir).plan
+    assert plan.key != first.key
+    assert "matrix_new.eod" in [test.name for test in plan.tests]
+
+
+def test_compile_test_rejects_unknown_expected_outcomes(tool_runspec):
+    runner = ConsoleTestRunner(tool_runspec)
+    plan = runner.compile_test(
+        {"name": "test_typo", "inputs": "test.eod", "output": "r.csv", "expect_error": "memory_limt"}
+    )
+    assert "Unknown expect_error outcome" in plan.error
+
+    plan = runner.compile_test(
+        {"name": "test_oom", "inputs": "test.eod", "output": "r.csv", "expect_error": ["memory_limit"]}
+    )
+    assert plan.error is None and plan.expects("memory_limit")
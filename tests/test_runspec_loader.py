@@ -0,0 +1,145 @@
+import json
+import os
+import pytest
+from pathlib import Path
+from console_test_runner.utils.runspec_loader import RunspecLoader
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    input_dir = tmp_path / "inputs"
+    (input_dir / "day1").mkdir(parents=True)
+    for name in ("day1/a.eod", "day1/b.eod", "c.eod", "notes.txt"):
+        (input_dir / name).touch()
+    return input_dir
+
+
+MATRIX = {
+    "name": "convert_{stem}_{variant}",
+    "inputs": "**/*.eod",
+    "output": "outputs/{stem}_{variant}.csv",
+    "arguments": [["--force"], ["--force", "--types"]],
+    "check_output_exist": True,
+}
+
+
+def test_expand_matrix(dataset):
+    cases = list(RunspecLoader.expand_matrix(MATRIX, dataset))
+
+    assert len(cases) == 6
+    by_name = {case["name"]: case for case in cases}
+    assert by_name["convert_a_1"] == {
+        "name": "convert_a_1",
+        "inputs": "day1/a.eod",
+        "arguments": ["--force", "--types"],
+        "output": "outputs/a_1.csv",
+        "check_output_exist": True,
+    }
+    assert by_name["convert_c_0"]["inputs"] == "c.eod"
+
+
+def test_expand_matrix_requires_inputs(dataset):
+    with pytest.raises(ValueError):
+        list(RunspecLoader.expand_matrix({"name": "no_inputs"}, dataset))
+
+
+def test_iter_tests_json(tmp_path, dataset):
+    runspec_file = tmp_path / "runspec.json"
+    runspec_file.write_text(
+        json.dumps(
+            {
+                "general": {"input_folder": str(dataset)},
+                "tests": [{"name": "test_help", "arguments": ["--help"]}],
+                "matrix": [MATRIX],
+            }
+        )
+    )
+
+    names = [case["name"] for case in RunspecLoader(runspec_file).iter_tests()]
+    assert names[0] == "test_help"
+    assert len(names) == 7
+
+
+def test_iter_tests_jsonl_is_lazy(tmp_path, dataset):
+    runspec_file = tmp_path / "runspec.jsonl"
+    lines = [
+        {"general": {"input_folder": str(dataset), "tool_name": "tool"}},
+        {"name": "test_help", "arguments": ["--help"]},
+        {"matrix": MATRIX},
+        "not json",
+    ]
+    runspec_file.write_text("\n".join(json.dumps(l) if l != "not json" else l for l in lines))
+
+    loader = RunspecLoader(runspec_file)
+    assert loader.general()["tool_name"] == "tool"
+    tests = loader.iter_tests()
+    assert next(tests)["name"] == "test_help"
+    assert len([next(tests) for _ in range(6)]) == 6
+    # The malformed line is only reached once the earlier cases have been consumed.
+    with pytest.raises(ValueError):
+        next(tests)
+
+
+def test_expand_matrix_is_sorted_and_expands_each_input_once(tmp_path):
+    for name in ("b/x.eod", "a/x.eod", "a/y.eod"):
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).touch()
+    matrix = {"name": "c_{input}", "inputs": ["**/*.eod", "a/*.eod"], "output": "o/{input}.csv"}
+
+    cases = list(RunspecLoader.expand_matrix(matrix, tmp_path))
+    assert [case["inputs"] for case in cases] == ["a/x.eod", "a/y.eod", "b/x.eod"]
+
+
+@pytest.mark.parametrize(
+    "pattern", ["**/*.eod", "*.eod", "day1/*.eod", "d*/?.eod", "**/[ab].eod", "**/day1/*", "**"]
+)
+def test_expand_matrix_matches_like_path_glob(dataset, pattern):
+    (dataset / "day1" / "deeper").mkdir()
+    (dataset / "day1" / "deeper" / "a.eod").touch()
+    (dataset / "day1-notes.eod").touch()
+    expected = [
+        path.relative_to(dataset).as_posix()
+        for path in sorted(dataset.glob(pattern))
+        if path.is_file()
+    ]
+    cases = RunspecLoader.expand_matrix({"name": "c_{input}", "inputs": pattern}, dataset)
+    assert [case["inputs"] for case in cases] == expected
+
+
+def test_expand_matrix_is_lazy(dataset, monkeypatch):
+    listed = []
+    real_scandir = os.scandir
+
+    def scandir(path):
+        listed.append(Path(path))
+        return real_scandir(path)
+
+    monkeypatch.setattr(os, "scandir", scandir)
+    cases = RunspecLoader.expand_matrix(MATRIX, dataset)
+    assert next(cases)["inputs"] == "c.eod"
+    # Only the top-level listing was needed for the first match.
+    assert listed == [dataset]
+
+
+def test_iter_tests_rejects_duplicate_names_across_the_suite(tmp_path):
+    for name in ("a/x.eod", "b/x.eod"):
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).touch()
+    runspec_file = tmp_path / "runspec.json"
+
+    def names(runspec):
+        runspec_file.write_text(json.dumps({"general": {"input_folder": str(tmp_path)}, **runspec}))
+        return [case["name"] for case in RunspecLoader(runspec_file).iter_tests()]
+
+    assert names({"matrix": [{"name": "c_{input}", "inputs": "**/*.eod"}]}) == ["c_a/x.eod", "c_b/x.eod"]
+    with pytest.raises(ValueError, match="Duplicate test name"):
+        names({"matrix": [{"name": "c_{stem}", "inputs": "**/*.eod"}]})
+    with pytest.raises(ValueError, match="Duplicate test name"):
+        names({"tests": [{"name": "c_a/x.eod"}], "matrix": [{"name": "c_{input}", "inputs": "a/*"}]})
+    with pytest.raises(ValueError, match="Duplicate test name"):
+        names({"matrix": [{"name": "c", "inputs": "a/*"}, {"name": "c", "inputs": "b/*"}]})
+
+
+def test_expand_matrix_rejects_flat_arguments(dataset):
+    with pytest.raises(ValueError, match="list of argument lists"):
+        list(RunspecLoader.expand_matrix({**MATRIX, "arguments": ["--force", "--types"]}, dataset))
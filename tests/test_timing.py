@@ -0,0 +1,87 @@
+import csv
+import json
+import platform
+import pstats
+import pytest
+from console_test_runner.test_runner import ConsoleTestRunner
+from console_test_runner.utils.timing import PhaseTimer, timer
+
+
+def test_disabled_timer_records_nothing():
+    timer = PhaseTimer()
+    with timer.span("compile", test="a"):
+        pass
+    assert timer.spans == []
+    assert timer.span("compile") is timer.span("run_conversion")
+
+
+def test_spans_nest_and_export_chrome_trace(tmp_path):
+    timer = PhaseTimer()
+    timer.enable()
+    with timer.span("test", test="a"):
+        with timer.span("check_inputs", test="a"):
+            pass
+
+    assert [span[0] for span in timer.spans] == ["check_inputs", "test"]
+    outer, inner = timer.spans[1], timer.spans[0]
+    assert outer[1] <= inner[1] and inner[1] + inner[2] <= outer[1] + outer[2]
+
+    trace_file = tmp_path / "trace.json"
+    timer.export(trace_file)
+    events = json.loads(trace_file.read_text())["traceEvents"]
+    assert [event["name"] for event in events] == ["check_inputs", "test"]
+    assert events[1]["ph"] == "X" and events[1]["args"] == {"test": "a"}
+
+
+def test_export_csv(tmp_path):
+    timer = PhaseTimer()
+    timer.enable()
+    with timer.span("cleanup", test="a"):
+        pass
+
+    csv_file = tmp_path / "trace.csv"
+    timer.export(csv_file)
+    with csv_file.open() as f:
+        rows = list(csv.DictReader(f))
+    assert rows[0]["phase"] == "cleanup"
+    assert json.loads(rows[0]["args"]) == {"test": "a"}
+
+
+def test_profile_phase(tmp_path):
+    def busy():
+        return sum(range(1000))
+
+    timer = PhaseTimer()
+    timer.enable(profile_phase="compile")
+    with timer.span("compile"):
+        busy()
+    with timer.span("cleanup"):
+        pass
+
+    profile_file = tmp_path / "compile.prof"
+    timer.save_profile(profile_file)
+    functions = {func[2] for func in pstats.Stats(str(profile_file)).stats}
+    assert "busy" in functions
+
+    timer.disable()
+    with pytest.raises(ValueError):
+        timer.save_profile(profile_file)
+
+
+@pytest.mark.skipif(platform.system() == "Windows", reason="uses a shell script as the tool")
+def test_runner_records_documented_phases(tool_runspec):
+    timer.enable()
+    try:
+        ConsoleTestRunner(tool_runspec).run_all_tests()
+        phases = {span[0] for span in timer.spans}
+    finally:
+        timer.disable()
+
+    assert {
+        "resolve_keywords",
+        "discover_executable",
+        "check_inputs",
+        "run_conversion",
+        "verify_outputs",
+        "cleanup",
+    } <= phases
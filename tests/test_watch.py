@@ -0,0 +1,116 @@
+import os
+import platform
+import shutil
+import struct
+import pytest
+from console_test_runner.test_runner import ConsoleTestRunner
+from console_test_runner.watch import TestWatcher
+
+pytestmark = pytest.mark.skipif(
+    platform.system() == "Windows", reason="uses a shell script as the tool"
+)
+
+
+@pytest.fixture(params=[False, True], ids=["polling", "inotify"])
+def watcher(request, tool_runspec):
+    if request.param and platform.system() != "Linux":
+        pytest.skip("inotify requires Linux")
+    watcher = TestWatcher(
+        ConsoleTestRunner(tool_runspec), interval=0.05, settle=0, use_inotify=request.param
+    )
+    yield watcher
+    watcher.backend.close()
+
+
+def touch(path):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def poll_until_changed(watcher):
+    for _ in range(20):
+        changed = watcher.poll()
+        if changed:
+            return changed
+    return set()
+
+
+def test_changed_input_reruns_dependent_tests(watcher, tmp_path):
+    touch(tmp_path / "inputs" / "other.eod")
+    changed = poll_until_changed(watcher)
+
+    assert changed == {tmp_path / "inputs" / "other.eod"}
+    assert watcher.affected_tests(changed) == ["test_other_conversion"]
+
+
+def test_changed_executable_reruns_all_tests(watcher, tmp_path):
+    touch(tmp_path / "tool" / "convert")
+    changed = poll_until_changed(watcher)
+
+    assert watcher.affected_tests(changed) == [
+        "test_basic_conversion",
+        "test_other_conversion",
+        "test_empty",
+    ]
+
+
+def test_edited_runspec_reruns_edited_tests(watcher, tool_runspec):
+    tool_runspec.write_text(tool_runspec.read_text().replace('"--force"', '"--types"'))
+    touch(tool_runspec)
+    changed = poll_until_changed(watcher)
+
+    assert watcher.affected_tests(changed) == ["test_other_conversion"]
+    assert watcher.plans["test_other_conversion"].argv[-1] == "--types"
+    assert watcher.run_tests(["test_other_conversion", "test_empty"]) == 0
+
+
+def test_duplicate_test_names_are_rejected(tool_runspec):
+    tool_runspec.write_text(tool_runspec.read_text().replace("test_other_conversion", "test_basic_conversion"))
+    with pytest.raises(ValueError, match="Duplicate test name"):
+        TestWatcher(ConsoleTestRunner(tool_runspec), use_inotify=False)
+
+
+@pytest.mark.skipif(platform.system() != "Linux", reason="inotify requires Linux")
+def test_inotify_overflow_checks_every_file(tool_runspec, tmp_path):
+    watcher = TestWatcher(ConsoleTestRunner(tool_runspec), interval=0.05, settle=0)
+    try:
+        touched = set()
+        overflow = struct.pack("iIII", -1, 0x4000, 0, 0)
+        assert watcher.backend.parse_events(overflow, touched)
+        assert touched == set()
+
+        # Simulate a change whose event was lost in the overflow.
+        touch(tmp_path / "inputs" / "test.eod")
+        watcher.backend.wait = lambda timeout: None
+        assert watcher.poll() == {tmp_path / "inputs" / "test.eod"}
+    finally:
+        watcher.backend.close()
+
+
+def test_deleted_and_recreated_tool_directory_is_watched_again(watcher, tmp_path):
+    executable = tmp_path / "tool" / "convert"
+    shutil.rmtree(tmp_path / "tool")
+    assert executable in poll_until_changed(watcher)
+
+    # A clean rebuild recreates the folder and writes the executable again.
+    executable.parent.mkdir()
+    executable.write_text('#!/bin/sh\necho rebuilt > "$4"\n')
+    executable.chmod(0o755)
+    assert poll_until_changed(watcher) == {executable}
+
+    touch(executable)
+    assert poll_until_changed(watcher) == {executable}
+
+
+def test_failed_environment_setup_keeps_previous_environment(watcher, tool_runspec, tmp_path):
+    test_config, environment = watcher.runner.test_config, watcher.runner.environment
+    tool_runspec.write_text(
+        tool_runspec.read_text().replace('"tool_name": "convert"', '"tool_name": "missing"')
+    )
+    touch(tool_runspec)
+    changed = poll_until_changed(watcher)
+
+    assert watcher.affected_tests(changed) == []
+    assert watcher.runner.test_config is test_config
+    assert watcher.runner.environment is environment
+    assert watcher.run_tests(["test_basic_conversion"]) == 0